@@ -0,0 +1,100 @@
+"""Build several output formats of the notes at once:
+
+       python build.py html latex epub
+
+   The sources are read and parsed once, by the first format's build, into
+   the doctrees in _build/doctrees. The other formats are then built at the
+   same time as each other, each from its own copy of those doctrees, so
+   that they only have to write their output and never write the same
+   files. Every build also uses Sphinx's own parallel workers, and the
+   diagram_cache extension makes sure that each diagram is only drawn once.
+
+   With --cold, the same formats are first built one after another from
+   nothing into a temporary directory, the way that make clean followed by
+   make html latex epub would build them, and the two times are compared.
+   """
+import argparse
+import concurrent.futures
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+NOTES_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = os.path.join(NOTES_DIR, "_build")
+
+
+def sphinx_build(builder, build_dir, doctree_dir, jobs=None, options=()):
+    """Run one sphinx-build, and return how many seconds it took."""
+    command = [sys.executable, "-m", "sphinx", "-b", builder, "-d", doctree_dir, "-q"]
+    if jobs != 1:
+        command += ["-j", str(jobs or "auto")]
+    command += list(options) + [NOTES_DIR, os.path.join(build_dir, builder)]
+
+    begin = time.perf_counter()
+    subprocess.run(command, check=True)
+    return time.perf_counter() - begin
+
+
+def build(formats, build_dir=BUILD_DIR, jobs=None, options=()):
+    """Build the formats, and return a list of (what, seconds)."""
+    doctree_dir = os.path.join(build_dir, "doctrees")
+    timings = [(formats[0], sphinx_build(formats[0], build_dir, doctree_dir, jobs, options))]
+    if len(formats) == 1:
+        return timings
+
+    def build_from_copy(builder):
+        copy = os.path.join(build_dir, "doctrees-%s" % builder)
+        shutil.rmtree(copy, ignore_errors=True)
+        shutil.copytree(doctree_dir, copy)
+        return sphinx_build(builder, build_dir, copy, jobs, options)
+
+    begin = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(min(len(formats) - 1, os.cpu_count() or 1)) as executor:
+        timings.extend(zip(formats[1:], executor.map(build_from_copy, formats[1:])))
+    timings.append(("(%s at once)" % ", ".join(formats[1:]), time.perf_counter() - begin))
+    return timings
+
+
+def cold_build(formats, options=()):
+    """Build the formats one after another from nothing, with no caches,
+       and return how many seconds it took.
+       """
+    with tempfile.TemporaryDirectory() as build_dir:
+        doctree_dir = os.path.join(build_dir, "doctrees")
+        # keep the diagrams out of the real cache
+        options = list(options) + ["-D", "diagram_cache_dir=%s" % os.path.join(build_dir, "diagrams")]
+        begin = time.perf_counter()
+        for builder in formats:
+            sphinx_build(builder, build_dir, doctree_dir, jobs=1, options=options)
+        return time.perf_counter() - begin
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build several formats of the notes at once.")
+    parser.add_argument("formats", help="the Sphinx builders to use (default: html latex epub)", nargs="*",
+                        default=["html", "latex", "epub"])
+    parser.add_argument("-j", "--jobs", help="the number of workers for each build (default: one per CPU)",
+                        type=int)
+    parser.add_argument("--cold", help="time a cold serial build first, to compare with", action="store_true")
+    parser.add_argument("-D", help="override a setting in conf.py, as sphinx-build -D does", metavar="NAME=VALUE",
+                        action="append", default=[])
+    opts = parser.parse_args()
+
+    options = [option for setting in opts.D for option in ("-D", setting)]
+
+    cold = None
+    if opts.cold:
+        cold = cold_build(opts.formats, options)
+        print("%-30s %8.2fs" % ("cold serial build", cold))
+
+    begin = time.perf_counter()
+    for what, seconds in build(opts.formats, jobs=opts.jobs, options=options):
+        print("%-30s %8.2fs" % (what, seconds))
+    total = time.perf_counter() - begin
+    print("%-30s %8.2fs" % ("total", total))
+
+    if cold is not None:
+        print("%.1f times as fast as the cold serial build" % (cold / total))
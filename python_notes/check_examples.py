@@ -0,0 +1,421 @@
+"""Run the Python code examples in the chapters, each in its own
+   subprocess, and report the ones which fail:
+
+       python check_examples.py
+       python check_examples.py Functions.rst Classes.rst
+
+   The examples are the literal blocks which follow a paragraph ending in
+   "::", and the contents of code-block directives for Python. Blocks which
+   are not valid Python 3 are reported separately, since many of the
+   examples are fragments or are written in other languages.
+
+   Examples which can't run on their own are reported separately too, and
+   are not failures:
+
+   fragment
+       the example carries on from an earlier one: it fails with a NameError
+       for a name which it never defines, or which it only gives a value at
+       the top level on or after the line which failed
+   interactive
+       the example needs input from the user: it wants more answers than
+       the canned ones it is given on stdin, can't use them, or needs
+       command-line arguments
+   unavailable
+       the example needs a module which is not installed, like the book's
+       own ourprog, a display for a GUI, or a file which is not there
+
+   The result of each example is cached in _build/examples.json under a
+   hash of its code and of the Python version, so only new or changed
+   examples are run again. Timeouts are not cached, since a longer
+   --timeout could change them.
+
+   Some examples deliberately raise exceptions, or never finish. These are
+   listed in examples_expected.txt by a hash of their code, so the list
+   only has to change when they do. Only the failures which are not in it
+   are reported, and make the check fail; examples which are expected to
+   time out are not run at all. After checking the new failures, record
+   them with:
+
+       python check_examples.py --update-expected
+   """
+import argparse
+import ast
+import concurrent.futures
+import glob
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+NOTES_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(NOTES_DIR, "_build", "examples.json")
+EXPECTED_FILE = os.path.join(NOTES_DIR, "examples_expected.txt")
+
+# The arguments of code-block directives which contain Python
+PYTHON_LANGUAGES = {"python", "python3", "py", "py3", "pycon"}
+
+# What input() reads in the examples, before it runs out and they are
+# taken to be interactive
+CANNED_INPUT = "1\n" * 10
+
+# The last line of the traceback, and the error, when a name is not defined
+UNDEFINED_NAME = re.compile(r'File "<string>", line (\d+), in (\S+)\n(?:(?!  File ).*\n)*?'
+                            r'NameError: name \'(\w+)\' is not defined')
+# Printed when an example is waiting for more input, or could not use it
+END_OF_INPUT = re.compile(r"^EOFError: EOF when reading a line", re.MULTILINE)
+BAD_INPUT = re.compile(r"^ValueError: ", re.MULTILINE)
+# Printed by argparse, and by setup.py, when a script needs arguments
+USAGE = re.compile(r"^usage: ", re.MULTILINE)
+# Printed when an example needs something which is not here
+UNAVAILABLE = re.compile(r"^(ModuleNotFoundError: No module named|_tkinter.TclError: no display name|FileNotFoundError: )",
+                         re.MULTILINE)
+
+# The version of the results in the cache, so that a cache written by a
+# version of this program which gave different results is not used
+RESULTS_VERSION = 2
+
+# Only the end of each example's output is kept, since that is where the
+# error is, and some examples print a great deal
+MAX_OUTPUT = 2000
+
+DIRECTIVE = re.compile(r"^(\s*)\.\. ([\w-]+)::\s*(\S*)")
+
+
+class Example:
+    __slots__ = ("filename", "line", "code")
+
+    def __init__(self, filename, line, code):
+        self.filename = filename
+        self.line = line
+        self.code = code
+
+    def key(self):
+        version = "%s %d.%d %d" % (sys.implementation.name, sys.version_info[0], sys.version_info[1], RESULTS_VERSION)
+        return hashlib.sha256(("%s\n%s" % (version, self.code)).encode("utf-8")).hexdigest()
+
+    def digest(self):
+        # a short hash of the code alone, for the list of expected failures
+        return hashlib.sha256(self.code.encode("utf-8")).hexdigest()[:16]
+
+
+def indent_of(line):
+    return len(line) - len(line.lstrip())
+
+
+def block_after(lines, start, indent):
+    """Return the indented block which starts after lines[start], and the
+       index of the line after it.
+       """
+    end = start + 1
+    block = []
+    while end < len(lines):
+        line = lines[end]
+        if line.strip() and indent_of(line) <= indent:
+            break
+        block.append(line)
+        end += 1
+    return block, end
+
+
+def without_prompts(code):
+    # keep only the input from an interactive session
+    if not code.lstrip().startswith(">>>"):
+        return code
+    return "\n".join(line[4:] for line in code.splitlines() if line.startswith((">>> ", "... ")))
+
+
+def extract(filename):
+    """Return the Examples in an rst file."""
+    with open(filename, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    examples = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        directive = DIRECTIVE.match(line)
+        options = 0
+        if directive:
+            indent, name, argument = directive.groups()
+            block, end = block_after(lines, i, len(indent))
+            if name in ("code-block", "sourcecode", "code") and argument in PYTHON_LANGUAGES:
+                # leave out the directive's options
+                while block and block[0].strip().startswith(":"):
+                    block.pop(0)
+                    options += 1
+            else: # a note, a diagram, a block in another language, and so on
+                i = end
+                continue
+        elif line.rstrip().endswith("::"):
+            block, end = block_after(lines, i, indent_of(line))
+        else:
+            i += 1
+            continue
+
+        code = textwrap.dedent("\n".join(block)).strip()
+        if code:
+            first_line = i + 2 + options + next(n for n, line in enumerate(block) if line.strip())
+            examples.append(Example(os.path.relpath(filename, NOTES_DIR), first_line, without_prompts(code) + "\n"))
+        i = end
+
+    return examples
+
+
+def defined_names(tree):
+    """Return the names which the code in an AST assigns to, imports or
+       defines anywhere, in any scope.
+       """
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, ast.alias):
+            names.add(node.asname or node.name.split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+    return names
+
+
+class TopLevelAssignments(ast.NodeVisitor):
+    """Finds the first line on which each name is given a value at the top
+       level of a module, outside functions, classes and comprehensions.
+       """
+
+    def __init__(self):
+        self.first_line = {}
+
+    def define(self, name, line):
+        self.first_line[name] = min(line, self.first_line.get(name, line))
+
+    def visit_Name(self, node):
+        if not isinstance(node.ctx, ast.Load):
+            self.define(node.id, node.lineno)
+
+    def visit_alias(self, node):
+        self.define(node.asname or node.name.split(".")[0], self.line)
+
+    def visit_Import(self, node):
+        self.line = node.lineno
+        self.generic_visit(node)
+
+    visit_ImportFrom = visit_Import
+
+    def visit_FunctionDef(self, node):
+        self.define(node.name, node.lineno) # but not what is inside it
+
+    visit_AsyncFunctionDef = visit_ClassDef = visit_FunctionDef
+
+    def visit_Lambda(self, node):
+        pass
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = visit_Lambda
+
+
+def calls_input(tree):
+    return any(isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "input"
+               for node in ast.walk(tree))
+
+
+def failure_status(tree, output):
+    """Return the status of an example which exited with an error."""
+    undefined = None
+    for undefined in UNDEFINED_NAME.finditer(output):
+        pass # the last one is the error
+    if undefined:
+        line, scope, name = int(undefined.group(1)), undefined.group(2), undefined.group(3)
+        if name not in defined_names(tree):
+            return "fragment"
+        if scope == "<module>":
+            assignments = TopLevelAssignments()
+            assignments.visit(tree)
+            if assignments.first_line.get(name, line) >= line:
+                return "fragment"
+    if END_OF_INPUT.search(output) or USAGE.search(output) or BAD_INPUT.search(output) and calls_input(tree):
+        return "interactive"
+    if UNAVAILABLE.search(output):
+        return "unavailable"
+    return "error"
+
+
+def run_example(example, timeout):
+    """Run an example and return its result, a dict with a status of "ok",
+       "error", "timeout", "not python", "fragment", "interactive" or
+       "unavailable", its output and its run time.
+       """
+    try:
+        tree = ast.parse(example.code, example.filename)
+        compile(tree, example.filename, "exec")
+    except (SyntaxError, ValueError) as e:
+        return {"status": "not python", "output": str(e), "seconds": 0.0}
+
+    begin = time.perf_counter()
+    # -I leaves out the user's site-packages and environment, and each
+    # example gets an empty directory in case it writes files; input()
+    # gets the canned answers instead of waiting for the user
+    with tempfile.TemporaryDirectory() as temp_dir:
+        try:
+            process = subprocess.run([sys.executable, "-I", "-c", example.code], cwd=temp_dir,
+                                     input=CANNED_INPUT.encode("ascii"), stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            output = e.output.decode("utf-8", "replace") if e.output else ""
+            return {"status": "timeout", "output": output[-MAX_OUTPUT:], "seconds": time.perf_counter() - begin}
+
+    output = process.stdout.decode("utf-8", "replace")[-MAX_OUTPUT:]
+    return {
+        "status": "ok" if process.returncode == 0 else failure_status(tree, output),
+        "output": output,
+        "seconds": time.perf_counter() - begin,
+    }
+
+
+def load_cache(filename):
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except (OSError, ValueError): # no cache yet, or a broken one
+        return {}
+
+
+def save_cache(cache, filename):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "w") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def load_expected(filename):
+    """Return {digest: status} for the expected failures listed in a file."""
+    expected = {}
+    try:
+        with open(filename) as f:
+            for line in f:
+                if line.strip() and not line.startswith("#"):
+                    digest, status = line.split()[:2]
+                    expected[digest] = status
+    except FileNotFoundError:
+        pass
+    return expected
+
+
+def save_expected(results, filename):
+    failures = sorted((example.filename, example.line, example.digest(), result["status"])
+                      for example, result, cached in results if result["status"] in ("error", "timeout"))
+    with open(filename, "w") as f:
+        f.write("# Examples which are expected to fail, written by check_examples.py --update-expected:\n")
+        f.write("# the hash of the code, the expected result, and where the example was\n")
+        for name, line, digest, status in failures:
+            f.write("%s %s %s:%d\n" % (digest, status, name, line))
+
+
+def check(examples, jobs=None, timeout=10.0, cache=None, report=None, expected=None):
+    """Run the examples which are not in the cache on jobs workers, add
+       their results to the cache, and return a list of (example, result,
+       cached). If report is given, it is called with each of these as
+       soon as it is known. Examples which expected ({digest: status})
+       says will time out are not run.
+       """
+    cache = {} if cache is None else cache
+    expected = expected or {}
+    results = []
+
+    def done(example, result, cached):
+        results.append((example, result, cached))
+        if report is not None:
+            report(example, result, cached)
+
+    to_run = {}
+    for example in examples:
+        key = example.key()
+        if expected.get(example.digest()) == "timeout":
+            done(example, {"status": "timeout", "output": "(expected to time out, so not run)", "seconds": 0.0}, True)
+        elif key in cache:
+            done(example, cache[key], True)
+        else:
+            to_run.setdefault(key, []).append(example) # the same code can be in more than one place
+
+    # the work is done in the subprocesses, so threads are enough to wait for them
+    with concurrent.futures.ThreadPoolExecutor(jobs or os.cpu_count()) as executor:
+        futures = {executor.submit(run_example, same[0], timeout): key for key, same in to_run.items()}
+        for future in concurrent.futures.as_completed(futures):
+            key = futures[future]
+            result = future.result()
+            if result["status"] != "timeout":
+                cache[key] = result
+            for example in to_run[key]:
+                done(example, result, False)
+
+    return results
+
+
+def is_unexpected(example, result, expected):
+    return result["status"] in ("error", "timeout") and expected.get(example.digest()) != result["status"]
+
+
+def print_result(example, result, cached, expected):
+    if is_unexpected(example, result, expected):
+        print("%s:%d: %s%s" % (example.filename, example.line, result["status"].upper(),
+                               " (cached)" if cached else ""))
+        print(textwrap.indent(result["output"].rstrip() or "(no output)", "    "))
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the code examples in the chapters.")
+    parser.add_argument("files", help="the rst files to check (default: all of them)", nargs="*")
+    parser.add_argument("-j", "--jobs", help="the number of examples to run at once (default: one per CPU)", type=int)
+    parser.add_argument("-t", "--timeout", help="the most seconds that an example may run for", type=float,
+                        default=10.0)
+    parser.add_argument("--no-cache", help="run every example, even if it has not changed", action="store_true")
+    parser.add_argument("--slowest", help="list this many of the slowest examples", type=int, default=10)
+    parser.add_argument("--update-expected", help="record the current failures as the expected ones",
+                        action="store_true")
+    opts = parser.parse_args()
+
+    begin = time.perf_counter()
+    files = opts.files or sorted(glob.glob(os.path.join(NOTES_DIR, "*.rst")))
+    examples = [example for filename in files for example in extract(filename)]
+
+    cache = {} if opts.no_cache else load_cache(CACHE_FILE)
+    expected = {} if opts.update_expected else load_expected(EXPECTED_FILE)
+    report = lambda example, result, cached: print_result(example, result, cached, expected)
+    results = check(examples, opts.jobs, opts.timeout, cache, report, expected)
+    save_cache(cache, CACHE_FILE)
+    if opts.update_expected:
+        save_expected(results, EXPECTED_FILE)
+        expected = load_expected(EXPECTED_FILE)
+
+    counts = {}
+    for example, result, cached in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    run = sum(1 for example, result, cached in results if not cached)
+
+    if opts.slowest:
+        print("Slowest examples:")
+        ran = sorted(results, key=lambda r: r[1]["seconds"], reverse=True)
+        for example, result, cached in ran[:opts.slowest]:
+            print("  %8.3fs  %s:%d" % (result["seconds"], example.filename, example.line))
+
+    print("%d examples (%s), %d run and %d cached, in %.2fs" % (
+        len(results), ", ".join("%d %s" % (count, status) for status, count in sorted(counts.items())),
+        run, len(results) - run, time.perf_counter() - begin))
+
+    unexpected = [example for example, result, cached in results if is_unexpected(example, result, expected)]
+    fixed = [example for example, result, cached in results
+             if example.digest() in expected and result["status"] not in ("error", "timeout")]
+    print("%d failures were expected, %d were not" % (
+        sum(1 for example, result, cached in results if example.digest() in expected) - len(fixed), len(unexpected)))
+    if fixed:
+        print("%d examples which were expected to fail now pass; run with --update-expected to record this"
+              % len(fixed))
+
+    if unexpected:
+        sys.exit(1)
@@ -17,6 +17,7 @@ import sys, os
 # add these directories to sys.path here. If the directory is relative to the
 # documentation root, use os.path.abspath to make it absolute, like shown here.
 sys.path.insert(0, os.path.abspath('../lib'))
+sys.path.insert(0, os.path.abspath('.'))
 
 # -- General configuration -----------------------------------------------------
 
@@ -25,7 +26,7 @@ sys.path.insert(0, os.path.abspath('../lib'))
 
 # Add any Sphinx extension module names here, as strings. They can be extensions
 # coming with Sphinx (named 'sphinx.ext.*') or your custom ones.
-extensions = ['sphinx.ext.doctest', 'sphinx.ext.todo', 'sphinxcontrib.blockdiag']
+extensions = ['sphinx.ext.doctest', 'sphinx.ext.todo', 'sphinxcontrib.blockdiag', 'diagram_cache']
 
 blockdiag_antialias = "true"
 
@@ -0,0 +1,60 @@
+"""A Sphinx extension which keeps the diagrams rendered by
+   sphinxcontrib.blockdiag in one directory shared by every builder, so
+   that each diagram is only drawn once however many formats are built.
+
+   blockdiag already names each image file after a hash of the diagram's
+   source and options, and does not draw an image whose file is already in
+   the output directory. This extension copies the file in from the cache
+   before blockdiag looks for it, and copies newly drawn files into the
+   cache. The cache is in _build/diagrams, or diagram_cache_dir if it is
+   set in conf.py.
+   """
+import os
+import shutil
+import tempfile
+
+from sphinxcontrib import blockdiag
+
+_to_drawer = blockdiag.blockdiag_node.to_drawer
+
+
+def cache_dir(builder):
+    return builder.config.diagram_cache_dir or os.path.join(builder.srcdir, "_build", "diagrams")
+
+
+def store(filename, cached):
+    # write to a temporary file first, so that a build running at the same
+    # time never sees half of a file
+    os.makedirs(os.path.dirname(cached), exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(cached))
+    os.close(handle)
+    shutil.copyfile(filename, temporary)
+    os.replace(temporary, cached)
+
+
+def to_drawer(node, image_format, builder, **kwargs):
+    image = _to_drawer(node, image_format, builder, **kwargs)
+    filename = image.filename
+    if filename is None: # an SVG image which is written into the page
+        return image
+
+    cached = os.path.join(cache_dir(builder), os.path.basename(filename))
+    if not os.path.isfile(filename) and os.path.isfile(cached):
+        shutil.copyfile(cached, filename)
+    elif not os.path.isfile(cached):
+        save = image.save
+
+        def save_and_store(*args, **kwargs):
+            result = save(*args, **kwargs)
+            store(filename, cached)
+            return result
+        image.save = save_and_store
+
+    return image
+
+
+def setup(app):
+    app.setup_extension("sphinxcontrib.blockdiag")
+    app.add_config_value("diagram_cache_dir", None, "")
+    blockdiag.blockdiag_node.to_drawer = to_drawer
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
@@ -0,0 +1,123 @@
+import unittest
+import os
+import tempfile
+
+import check_examples
+
+CHAPTER = """Some text::
+
+    x = 1
+    print(x)
+
+.. code-block:: python
+    :linenos:
+
+    raise ValueError("deliberately")
+
+.. code-block:: c
+
+    int main() { return 0; }
+
+.. Note:: not code::
+
+    also not code
+
+An interactive session::
+
+    >>> y = 2
+    >>> y
+    2
+
+Not Python::
+
+    if x = 3:
+"""
+
+class TestCheckExamples(unittest.TestCase):
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix=".rst")
+        with os.fdopen(handle, "w") as f:
+            f.write(CHAPTER)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_extract(self):
+        examples = check_examples.extract(self.filename)
+        self.assertEqual([e.code for e in examples],
+                         ["x = 1\nprint(x)\n", 'raise ValueError("deliberately")\n', "y = 2\ny\n", "if x = 3:\n"])
+        self.assertEqual([e.line for e in examples], [3, 9, 21, 27])
+
+    def test_check_and_cache(self):
+        examples = check_examples.extract(self.filename)
+        cache = {}
+        results = check_examples.check(examples, jobs=2, cache=cache)
+        statuses = {e.code: (result["status"], cached) for e, result, cached in results}
+        self.assertEqual(statuses["x = 1\nprint(x)\n"], ("ok", False))
+        self.assertEqual(statuses['raise ValueError("deliberately")\n'], ("error", False))
+        self.assertEqual(statuses["if x = 3:\n"], ("not python", False))
+        self.assertEqual(len(cache), 4)
+
+        results = check_examples.check(examples, cache=cache)
+        self.assertTrue(all(cached for e, result, cached in results))
+
+    def test_timeout(self):
+        example = check_examples.Example("loop.rst", 1, "while True:\n    pass\n")
+        self.assertEqual(check_examples.run_example(example, timeout=0.5)["status"], "timeout")
+
+        # a timeout is not cached, since a longer timeout might give a different result
+        cache = {}
+        results = check_examples.check([example], timeout=0.5, cache=cache)
+        self.assertEqual(results[0][1]["status"], "timeout")
+        self.assertEqual(cache, {})
+
+        # unless it is expected, in which case the example is not run at all
+        results = check_examples.check([example], timeout=60, cache=cache, expected={example.digest(): "timeout"})
+        self.assertEqual(results[0][1]["status"], "timeout")
+
+    def test_expected(self):
+        examples = check_examples.extract(self.filename)
+        results = check_examples.check(examples)
+        expected_file = self.filename + ".expected"
+        try:
+            check_examples.save_expected(results, expected_file)
+            expected = check_examples.load_expected(expected_file)
+        finally:
+            os.remove(expected_file)
+        self.assertEqual(expected, {examples[1].digest(): "error"})
+        self.assertFalse(any(check_examples.is_unexpected(example, result, expected)
+                             for example, result, cached in results))
+        error = next(result for example, result, cached in results if example is examples[1])
+        self.assertTrue(check_examples.is_unexpected(examples[1], error, {}))
+
+class TestFailureStatus(unittest.TestCase):
+    def status(self, code):
+        return check_examples.run_example(check_examples.Example("test.rst", 1, code), timeout=10)["status"]
+
+    def test_fragment(self):
+        # a name which is never defined, or only defined later
+        self.assertEqual(self.status("print(total)\n"), "fragment")
+        self.assertEqual(self.status("count = count + 1\n"), "fragment")
+        self.assertEqual(self.status("if x == 0:\n    x += 1\n"), "fragment")
+        self.assertEqual(self.status("def f():\n    return missing\nf()\n"), "fragment")
+
+    def test_name_error(self):
+        # the name is defined before the line which fails, or is a local name in a function
+        self.assertEqual(self.status("def f():\n    g()\nf()\ndef g():\n    pass\n"), "error")
+        self.assertEqual(self.status("x = 1\ndel x\nprint(x)\n"), "error")
+
+    def test_interactive(self):
+        self.assertEqual(self.status("print(int(input()) + 1)\n"), "ok")
+        self.assertEqual(self.status("while input() != 'yes':\n    pass\n"), "interactive")
+        self.assertEqual(self.status("import datetime\ndatetime.datetime.strptime(input(), '%H:%M')\n"), "interactive")
+        self.assertEqual(self.status("import argparse\nargparse.ArgumentParser().add_argument('n')\n"
+                                     "argparse.ArgumentParser().parse_args(['-x'])\n"), "interactive")
+        # a ValueError is only blamed on the canned answers if the example reads any
+        self.assertEqual(self.status("int('3.7')\n"), "error")
+
+    def test_unavailable(self):
+        self.assertEqual(self.status("import no_such_module_here\n"), "unavailable")
+        self.assertEqual(self.status("open('no_such_file.txt')\n"), "unavailable")
+
+if __name__ == "__main__":
+    unittest.main()
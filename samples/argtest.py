@@ -1,31 +1,141 @@
-import argparse
-import logging
-
-parser = argparse.ArgumentParser()
-# two integers
-parser.add_argument("num1", help="the first number", type=int)
-parser.add_argument("num2", help="the second number", type=int)
-# a string, limited to a list of options
-parser.add_argument("op", help="the desired arithmetic operation", choices=['add', 'sub', 'mul', 'div'])
-# an optional flag, true by default, with a short and a long name
-parser.add_argument("-v", "--verbose", help="turn on verbose output", action="store_true")
-
-opts = parser.parse_args()
-
-if opts.verbose:
-    logging.basicConfig(level=logging.DEBUG)
-
-logging.debug("First number: %d" % opts.num1)
-logging.debug("Second number: %d" % opts.num2)
-logging.debug("Operation: %s" % opts.op)
-
-if opts.op == "add":
-    result = opts.num1 + opts.num2
-elif opts.op == "sub":
-    result = opts.num1 - opts.num2
-elif opts.op == "mul":
-    result = opts.num1 * opts.num2
-elif opts.op == "div":
-    result = opts.num1 / opts.num2
-
-print(result)
\ No newline at end of file
+# argparse and logging are only imported when they are needed, since
+# importing them takes longer than a single calculation
+import operator
+import sys
+
+OPERATIONS = {
+    'add': operator.add,
+    'sub': operator.sub,
+    'mul': operator.mul,
+    'div': operator.truediv,
+}
+
+def evaluate_line(line):
+    """Evaluate one "num1 num2 op" line, as bytes or a string, and return the
+       result or an error message as a line of output.
+       """
+    try:
+        if isinstance(line, bytes):
+            line = line.decode() # a UnicodeDecodeError is a ValueError
+        num1, num2, op = line.split()
+        return "%s\n" % OPERATIONS[op](int(num1), int(num2))
+    except KeyError:
+        return "error: unknown operation\n"
+    except (ValueError, ArithmeticError) as e:
+        return "error: %s\n" % e
+
+def evaluate_stream(read, write, flush):
+    """Evaluate lines as they arrive, and return the number of lines which
+       were evaluated; blank lines are skipped. read
+       returns whatever bytes are available, or nothing at the end of the
+       input. The results for all the complete lines in each read are written
+       and flushed together, so a client which sends one line at a time gets
+       each answer straight away, and a client which sends many lines at once
+       gets them back in one batch.
+       """
+    count = 0
+    pending = b""
+    while True:
+        data = read()
+        if not data:
+            break
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        lines = [line for line in lines if line.strip()]
+        write("".join(map(evaluate_line, lines)).encode())
+        flush()
+        count += len(lines)
+
+    if pending.strip():
+        write(evaluate_line(pending).encode())
+        flush()
+        count += 1
+
+    return count
+
+def serve(socket_path):
+    """Evaluate lines sent over connections to a Unix socket until interrupted."""
+    import os
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            evaluate_stream(lambda: self.rfile.read1(65536), self.wfile.write, self.wfile.flush)
+
+    # if the path is in use, this fails before the socket file is ours to remove
+    server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    try:
+        with server:
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.unlink(socket_path)
+
+def parse_simple_args(args):
+    """Return (num1, num2, op) if args are just two integers and an
+       operation, which is the usual way this program is run, or None if
+       argparse is needed to make sense of them.
+       """
+    if len(args) == 3 and args[2] in OPERATIONS:
+        try:
+            return int(args[0]), int(args[1]), args[2]
+        except ValueError:
+            pass
+    return None
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    # two integers
+    parser.add_argument("num1", help="the first number", type=int, nargs="?")
+    parser.add_argument("num2", help="the second number", type=int, nargs="?")
+    # a string, limited to a list of options
+    parser.add_argument("op", help="the desired arithmetic operation", choices=sorted(OPERATIONS), nargs="?")
+    # an optional flag, true by default, with a short and a long name
+    parser.add_argument("-v", "--verbose", help="turn on verbose output", action="store_true")
+    # batch and server modes, which read many "num1 num2 op" lines
+    parser.add_argument("-b", "--batch", help="evaluate lines from a file, or - for standard input", metavar="FILE")
+    parser.add_argument("-s", "--serve", help="evaluate lines sent to this Unix socket", metavar="SOCKET")
+
+    opts = parser.parse_args()
+
+    if opts.verbose:
+        import logging
+
+        logging.basicConfig(level=logging.DEBUG)
+
+    if opts.serve:
+        serve(opts.serve)
+
+    elif opts.batch:
+        import time
+
+        f_in = sys.stdin.buffer if opts.batch == "-" else open(opts.batch, "rb")
+        begin = time.perf_counter()
+        with f_in:
+            count = evaluate_stream(lambda: f_in.read1(65536), sys.stdout.buffer.write, sys.stdout.buffer.flush)
+        elapsed = time.perf_counter() - begin
+        # report the throughput on standard error, to keep it apart from the results
+        print("%d operations in %.3fs (%.0f operations per second)" % (count, elapsed, count / elapsed if elapsed else 0),
+              file=sys.stderr)
+
+    else:
+        if opts.op is None:
+            parser.error("the following arguments are required: num1, num2, op")
+
+        if opts.verbose:
+            logging.debug("First number: %d" % opts.num1)
+            logging.debug("Second number: %d" % opts.num2)
+            logging.debug("Operation: %s" % opts.op)
+
+        print(OPERATIONS[opts.op](opts.num1, opts.num2))
+
+if __name__ == "__main__":
+    simple_args = parse_simple_args(sys.argv[1:])
+    if simple_args is None:
+        main()
+    else:
+        num1, num2, op = simple_args
+        print(OPERATIONS[op](num1, num2))
@@ -1,33 +1,231 @@
+# Modules which are only needed for --jobs, or only on the command line, are
+# imported where they are used, to keep the start-up time down
 import sys
-import argparse
 import csv
+import operator
+import os
 import re
 
-parser = argparse.ArgumentParser()
-parser.add_argument("input", help="the input CSV file")
-parser.add_argument("order", help="the desired column order; comma-separated")
-parser.add_argument("-o", "--output", help="the destination CSV file")
+# Output is written through a buffer this large, so that rows reach the disk in big batches
+BUFFER_SIZE = 1024 * 1024
+# The largest byte range a worker reads into memory at once
+MAX_RANGE_SIZE = 64 * 1024 * 1024
 
-opts = parser.parse_args()
+CSV_SUFFIX = re.compile(r"\.csv", re.IGNORECASE)
 
-output_file = opts.output
-if not output_file:
-    output_file = re.sub("\.csv", "_reordered.csv", opts.input, re.IGNORECASE)
+def parse_order(order_str, header):
+    """Turn a comma-separated list of column indices or names into a list of
+       indices. Names are looked up in the header row.
+       """
+    indices = []
+    for column in order_str.split(','):
+        try:
+            indices.append(int(column))
+        except ValueError:
+            try:
+                indices.append(header.index(column))
+            except ValueError:
+                raise ValueError("Invalid column: %s" % column)
+    return indices
 
-try:
-    new_row_indices = [int(i) for i in opts.order.split(',')]
-except ValueError:
-    sys.exit("Unable to parse column list.")
+def projection(indices, width):
+    """Check the indices against the row width once, and return a function
+       which picks those columns out of a row.
+       """
+    for i in indices:
+        if not -width <= i < width:
+            raise ValueError("Invalid column: %d" % i)
 
-with open(opts.input) as f_in:
-    with open(output_file, "w") as f_out:
+    if len(indices) == 1:
+        # itemgetter with a single index returns the item itself, not a tuple
+        i, = indices
+        return lambda row: (row[i],)
+    return operator.itemgetter(*indices)
+
+class AtomicOutput:
+    """A context manager which gives the name of a new temporary file next to
+       output_file, and moves it over output_file only if the block finishes
+       without an error, so that a failure never leaves a partial output file
+       behind.
+       """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.temp_file = None
+
+    def __enter__(self):
+        attempt = 0
+        while True:
+            temp_file = "%s.%d-%d.tmp" % (self.output_file, os.getpid(), attempt)
+            try:
+                os.close(os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+                break
+            except FileExistsError:
+                attempt += 1
+        self.temp_file = temp_file
+        return temp_file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            os.replace(self.temp_file, self.output_file)
+        else:
+            os.remove(self.temp_file)
+
+# The bytes after which a quote character starts a quoted field
+FIELD_STARTS = (b',', b'\n', b'\r')
+
+def scan_quotes(data, start, position, end, quoted):
+    """Follow the quoted fields in data[position:end], given that a record
+       starts at data[start] and that data[position] is inside a quoted
+       field if quoted is true, and return whether data[end] is inside one.
+       As in csv.reader, a quote only opens a field if it comes at the start
+       of the field; anywhere else in an unquoted field it is an ordinary
+       character. Inside a quoted field, a doubled quote is an escaped quote.
+       """
+    while True:
+        quote = data.find(b'"', position, end)
+        if quote == -1:
+            return quoted
+        if quoted:
+            if quote + 1 < end and data[quote + 1:quote + 2] == b'"':
+                position = quote + 2
+                continue
+            quoted = False
+        elif quote == start or data[quote - 1:quote] in FIELD_STARTS:
+            quoted = True
+        position = quote + 1
+
+def record_end(data, start, position):
+    """Return the end of the record which contains data[position], given that
+       a record starts at data[start]. A newline inside a quoted field is part
+       of the field, so it does not end the record.
+       """
+    quoted = False
+    scanned = start
+    while True:
+        newline = data.find(b'\n', position)
+        if newline == -1:
+            return len(data)
+        quoted = scan_quotes(data, start, scanned, newline, quoted)
+        if not quoted:
+            return newline + 1
+        scanned = position = newline + 1
+
+def record_ranges(data, start, size):
+    """Split data[start:] into byte ranges of about size bytes which end on
+       record boundaries.
+       """
+    ranges = []
+    while start < len(data):
+        end = record_end(data, start, min(start + size, len(data)))
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+def _project_range(input_file, start, end, indices, width, part_file):
+    import io
+    import locale
+    import mmap
+
+    project = projection(indices, width)
+    with open(input_file, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            text = data[start:end].decode(locale.getpreferredencoding(False))
+
+    r = csv.reader(io.StringIO(text, newline=''))
+    with open(part_file, "w", newline='', buffering=BUFFER_SIZE) as f_out:
+        try:
+            csv.writer(f_out).writerows(map(project, r))
+        except IndexError:
+            raise ValueError("A row after byte %d has fewer columns than the first row." % start)
+
+def _reorder_parallel(input_file, temp_file, indices, width, jobs):
+    import mmap
+    import multiprocessing
+    import shutil
+    import tempfile
+
+    with open(input_file, 'rb') as f_in:
+        with mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header_end = record_end(data, 0, 0)
+            # several ranges per worker keep the workers busy and the ranges small
+            size = max(1, min(MAX_RANGE_SIZE, (len(data) - header_end) // (jobs * 4) + 1))
+            ranges = record_ranges(data, header_end, size)
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(temp_file)) as part_dir:
+        part_files = [os.path.join(part_dir, "%d.csv" % i) for i in range(len(ranges))]
+        tasks = [(input_file, start, end, indices, width, part_file)
+                 for (start, end), part_file in zip(ranges, part_files)]
+
+        with multiprocessing.Pool(jobs) as pool:
+            pool.starmap(_project_range, tasks)
+
+        with open(temp_file, "ab") as f_out:
+            for part_file in part_files:
+                with open(part_file, "rb") as f_part:
+                    shutil.copyfileobj(f_part, f_out, BUFFER_SIZE)
+
+def reorder(input_file, output_file, order_str, jobs=1):
+    """Write the columns of input_file to output_file in the given order. If
+       jobs is more than one, the file is split into byte ranges which are
+       projected by that many worker processes.
+       """
+    if jobs < 1:
+        raise ValueError("The number of jobs must be at least 1, not %d." % jobs)
+
+    with open(input_file, newline='') as f_in:
         r = csv.reader(f_in)
-        w = csv.writer(f_out)
-        for row in r:
-            new_row = []
-            for i in new_row_indices:
-                try:
-                    new_row.append(row[i])
-                except IndexError:
-                    sys.exit("Invalid column: %d" % i)
-            w.writerow(new_row)
+        header = next(r, None)
+        if header is not None:
+            indices = parse_order(order_str, header)
+            project = projection(indices, len(header))
+
+        with AtomicOutput(output_file) as temp_file:
+            with open(temp_file, "w", newline='', buffering=BUFFER_SIZE) as f_out:
+                w = csv.writer(f_out)
+                if header is not None:
+                    w.writerow(project(header))
+                    if jobs == 1:
+                        try:
+                            w.writerows(map(project, r))
+                        except IndexError:
+                            raise ValueError("Line %d has fewer columns than the first row." % r.line_num)
+
+            if header is not None and jobs > 1:
+                _reorder_parallel(input_file, temp_file, indices, len(header), jobs)
+
+def positive_int(text):
+    # for argparse, which reports the ValueError as an invalid positive_int value
+    value = int(text)
+    if value < 1:
+        raise ValueError(text)
+    return value
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="the input CSV file")
+    parser.add_argument("order", help="the desired column order; comma-separated indices or header names")
+    parser.add_argument("-o", "--output", help="the destination CSV file")
+    parser.add_argument("-j", "--jobs", help="the number of worker processes", type=positive_int, default=1)
+    parser.add_argument("-c", "--cache", help="read the columns from a column cache, building it if necessary "
+                        "(cannot be used with --jobs)", action="store_true")
+
+    opts = parser.parse_args()
+
+    if opts.cache and opts.jobs != 1:
+        parser.error("--cache reads the columns in one process, so it cannot be used with --jobs")
+
+    output_file = opts.output
+    if not output_file:
+        output_file = CSV_SUFFIX.sub("_reordered.csv", opts.input)
+
+    try:
+        if opts.cache:
+            from csvcache import reorder_cached
+            reorder_cached(opts.input, output_file, opts.order)
+        else:
+            reorder(opts.input, output_file, opts.order, opts.jobs)
+    except ValueError as e:
+        sys.exit(str(e))
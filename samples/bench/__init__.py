@@ -0,0 +1,6 @@
+"""Benchmarks for the samples: seeded workloads at several input sizes,
+   results saved as JSON together with a description of the machine they
+   were run on, and a comparison which points out statistically
+   significant slowdowns. Run python -m bench --help from the samples
+   directory for the commands.
+   """
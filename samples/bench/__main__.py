@@ -0,0 +1,59 @@
+import argparse
+import sys
+
+from bench import compare, runner
+from bench.workloads import WORKLOADS
+
+def print_result(result):
+    print("%-17s %8d  min %10.6fs  median %10.6fs" % (result["workload"], result["size"], result["min"], result["median"]))
+    sys.stdout.flush()
+
+def run_command(opts):
+    results = runner.run(opts.workloads, opts.sizes, opts.repeat, opts.seed, report=print_result)
+    if opts.output:
+        runner.save(results, opts.output)
+        print("Saved the results in %s" % opts.output)
+
+def compare_command(opts):
+    baseline, current = runner.load(opts.baseline), runner.load(opts.current)
+
+    for key, old, new in compare.environment_differences(baseline, current):
+        print("Warning: the %s has changed from %s to %s, so the timings may not be comparable" % (key, old, new))
+
+    slower = []
+    for workload, size, old_median, new_median, p, verdict in compare.compare(baseline, current, opts.alpha,
+                                                                             opts.threshold):
+        change = (new_median - old_median) / old_median * 100
+        print("%-17s %8d  %10.6fs -> %10.6fs  %+7.1f%%  p=%.4f  %s"
+              % (workload, size, old_median, new_median, change, p, verdict.upper()))
+        if verdict == "slower":
+            slower.append("%s (%d)" % (workload, size))
+
+    if slower:
+        sys.exit("Significantly slower: %s" % ", ".join(slower))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Benchmark the samples.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("-w", "--workloads", help="the workloads to run (default: all)", nargs="+",
+                            choices=sorted(WORKLOADS))
+    run_parser.add_argument("-s", "--sizes", help="the input sizes to use (default: each workload's own)",
+                            type=int, nargs="+")
+    run_parser.add_argument("-r", "--repeat", help="the number of timed runs of each workload and size",
+                            type=int, default=10)
+    run_parser.add_argument("--seed", help="the seed for the generated inputs", type=int, default=0)
+    run_parser.add_argument("-o", "--output", help="the JSON file to save the results in")
+    run_parser.set_defaults(function=run_command)
+
+    compare_parser = subparsers.add_parser("compare", help="compare two sets of saved results")
+    compare_parser.add_argument("baseline", help="the JSON results to compare against")
+    compare_parser.add_argument("current", help="the JSON results to check")
+    compare_parser.add_argument("-a", "--alpha", help="the significance level", type=float, default=0.01)
+    compare_parser.add_argument("-t", "--threshold", help="the smallest change to report, as a fraction",
+                                type=float, default=0.1)
+    compare_parser.set_defaults(function=compare_command)
+
+    opts = parser.parse_args()
+    opts.function(opts)
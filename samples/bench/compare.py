@@ -0,0 +1,77 @@
+import math
+import statistics
+
+# The environment fields which have to match for timings to be comparable
+ENVIRONMENT_KEYS = ["python", "implementation", "machine", "processor", "cpu_count", "hostname"]
+
+def ranks(values):
+    """Return the rank of each value, from 1, giving tied values the average of their ranks."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    result = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            result[order[k]] = (i + j) / 2.0 + 1
+        i = j + 1
+    return result
+
+def mann_whitney_greater(xs, ys):
+    """Return the p-value of a one-sided Mann-Whitney U test of whether the
+       values in xs tend to be greater than those in ys, using the normal
+       approximation with a correction for ties. Unlike a t-test, this does
+       not assume that the values are normally distributed, which timings
+       with their long tails of slow runs are not.
+       """
+    n_x, n_y = len(xs), len(ys)
+    n = n_x + n_y
+    all_ranks = ranks(list(xs) + list(ys))
+    u = sum(all_ranks[:n_x]) - n_x * (n_x + 1) / 2.0
+
+    tied = {}
+    for rank in all_ranks:
+        tied[rank] = tied.get(rank, 0) + 1
+    tie_correction = sum(t ** 3 - t for t in tied.values()) / float(n * (n - 1))
+    variance = n_x * n_y / 12.0 * ((n + 1) - tie_correction)
+    if variance == 0: # every value is the same
+        return 1.0
+
+    z = (u - n_x * n_y / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def compare(baseline, current, alpha=0.01, threshold=0.1):
+    """Compare the results of two runs, and return a list of (workload,
+       size, baseline median, current median, p-value, verdict) tuples for
+       the workloads and sizes which both of them have. The verdict is
+       "slower" or "faster" if the change is statistically significant at
+       the alpha level and bigger than the threshold fraction of the
+       baseline median, and "" otherwise.
+       """
+    baseline_results = {(r["workload"], r["size"]): r for r in baseline["results"]}
+    comparisons = []
+
+    for result in current["results"]:
+        key = result["workload"], result["size"]
+        if key not in baseline_results:
+            continue
+        old_times, new_times = baseline_results[key]["times"], result["times"]
+        old_median, new_median = statistics.median(old_times), statistics.median(new_times)
+
+        p_slower = mann_whitney_greater(new_times, old_times)
+        p_faster = mann_whitney_greater(old_times, new_times)
+        if p_slower < alpha and new_median > old_median * (1 + threshold):
+            verdict, p = "slower", p_slower
+        elif p_faster < alpha and new_median < old_median * (1 - threshold):
+            verdict, p = "faster", p_faster
+        else:
+            verdict, p = "", min(p_slower, p_faster)
+
+        comparisons.append(key + (old_median, new_median, p, verdict))
+
+    return comparisons
+
+def environment_differences(baseline, current):
+    return [(key, baseline["environment"].get(key), current["environment"].get(key))
+            for key in ENVIRONMENT_KEYS if baseline["environment"].get(key) != current["environment"].get(key)]
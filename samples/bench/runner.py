@@ -0,0 +1,99 @@
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.workloads import SAMPLES_DIR, WORKLOADS
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=SAMPLES_DIR, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, universal_newlines=True, check=True)
+    except (OSError, subprocess.CalledProcessError): # not run from a git checkout
+        return None
+    return result.stdout.strip()
+
+def environment():
+    """Describe the machine and interpreter, since timings from different ones cannot be compared."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "executable": sys.executable,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "hostname": platform.node(),
+        "git_commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+def time_runs(function, repeat, warmup=1, prepare=None):
+    """Call function repeat times, after warmup calls which are not timed,
+       and return how long each call took. If prepare is given, it is called
+       before each call, outside the timing, and function is given what it
+       returns -- for example a fresh copy of a list which function sorts.
+       """
+    for i in range(warmup):
+        function() if prepare is None else function(prepare())
+
+    times = []
+    for i in range(repeat):
+        if prepare is None:
+            begin = time.perf_counter()
+            function()
+        else:
+            argument = prepare()
+            begin = time.perf_counter()
+            function(argument)
+        times.append(time.perf_counter() - begin)
+    return times
+
+def best_of(repeat, function, *args, prepare=None):
+    """Return the shortest of repeat timings of function(*args), or of
+       function(prepare()) if prepare is given.
+       """
+    if prepare is None:
+        return min(time_runs(lambda: function(*args), repeat, warmup=0))
+    return min(time_runs(function, repeat, warmup=0, prepare=prepare))
+
+def run(names=None, sizes=None, repeat=10, seed=0, report=None):
+    """Run the named workloads (all of them by default) at each of their
+       sizes, or only at the given sizes, and return the results. Every
+       workload and size gets its own random number generator, seeded from
+       seed, its name and its size, so that its input is always the same.
+       If report is given, it is called with each result as it is made.
+       """
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in names or sorted(WORKLOADS):
+            prepare, workload_sizes = WORKLOADS[name]
+            for n in sizes or workload_sizes:
+                rng = random.Random("%s:%s:%d" % (seed, name, n))
+                times = time_runs(prepare(n, rng, temp_dir), repeat)
+                result = {
+                    "workload": name,
+                    "size": n,
+                    "times": times,
+                    "min": min(times),
+                    "median": statistics.median(times),
+                }
+                results.append(result)
+                if report is not None:
+                    report(result)
+
+    return {"environment": environment(), "seed": seed, "repeat": repeat, "results": results}
+
+def save(results, filename):
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+def load(filename):
+    with open(filename) as f:
+        return json.load(f)
@@ -0,0 +1,68 @@
+import os
+import sys
+
+SAMPLES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each workload prepares its input once for each size, outside the timing,
+# and returns a function which does the work being measured once. Functions
+# which change their input are given a fresh copy every time.
+
+def merge_sort_workload(n, rng, temp_dir):
+    from merge_sort import merge_sort
+    items = [rng.random() for i in range(n)]
+    return lambda: merge_sort(list(items))
+
+def selection_sort_workload(n, rng, temp_dir):
+    from selection_sort import selection_sort
+    items = [rng.random() for i in range(n)]
+    return lambda: selection_sort(list(items))
+
+# Lookups done in each timed run of the binary search
+SEARCHES = 1000
+
+def binary_search_workload(n, rng, temp_dir):
+    from binary_search import binary_search
+    items = sorted(rng.sample(range(n * 10), n))
+    queries = [rng.choice(items) for i in range(SEARCHES)]
+
+    def search():
+        for query in queries:
+            binary_search(items, query)
+    return search
+
+def price_estimate_workload(n, rng, temp_dir):
+    # estimate.py is not in a package, so its directory has to be on the path
+    estimate_dir = os.path.join(SAMPLES_DIR, "estimate")
+    if estimate_dir not in sys.path:
+        sys.path.insert(0, estimate_dir)
+    from estimate import price_estimate
+    from bench_estimate import make_calls, as_strings
+
+    calls = as_strings(*make_calls(n, seed=rng.randrange(2 ** 32)))
+
+    def price():
+        for call in calls:
+            price_estimate(*call)
+    return price
+
+# Columns in the CSV file which is reordered
+CSV_WIDTH = 10
+
+def reorder_workload(n, rng, temp_dir):
+    from argtest2 import reorder
+    from bench_argtest2 import generate_csv
+
+    input_file = os.path.join(temp_dir, "reorder_%d.csv" % n)
+    output_file = os.path.join(temp_dir, "reorder_%d_output.csv" % n)
+    generate_csv(input_file, n, CSV_WIDTH, seed=rng.randrange(2 ** 32))
+    order = ",".join(str(i) for i in range(CSV_WIDTH - 1, -1, -1))
+    return lambda: reorder(input_file, output_file, order)
+
+# name: (prepare, sizes)
+WORKLOADS = {
+    "merge_sort": (merge_sort_workload, [1000, 10000, 100000]),
+    "selection_sort": (selection_sort_workload, [100, 300, 1000]),
+    "binary_search": (binary_search_workload, [1000, 100000, 1000000]),
+    "price_estimate": (price_estimate_workload, [1000, 10000, 100000]),
+    "argtest2_reorder": (reorder_workload, [1000, 10000, 100000]),
+}
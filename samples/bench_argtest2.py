@@ -0,0 +1,53 @@
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from argtest2 import reorder
+
+def generate_csv(filename, rows, width, seed=0):
+    """Write a CSV file with a header and the given number of rows and
+       columns. Some fields are quoted and contain commas, quotes and
+       newlines, so that record boundaries cannot be found by splitting
+       lines.
+       """
+    rng = random.Random(seed)
+    with open(filename, "w", newline='') as f:
+        w = csv.writer(f)
+        w.writerow(["column%d" % i for i in range(width)])
+        for i in range(rows):
+            row = [str(rng.randrange(1000000)) for j in range(width)]
+            if rng.random() < 0.1:
+                row[rng.randrange(width)] = 'a "quoted",\nmulti-line field'
+            w.writerow(row)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--rows", help="the number of rows to generate", type=int, default=200000)
+    parser.add_argument("-w", "--width", help="the number of columns to generate", type=int, default=20)
+    parser.add_argument("-j", "--jobs", help="the worker counts to compare", type=int, nargs="+", default=[1, 2, 4])
+
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, "input.csv")
+        generate_csv(input_file, opts.rows, opts.width)
+        size = os.path.getsize(input_file)
+        order = ",".join(str(i) for i in range(opts.width - 1, -1, -2))
+
+        expected = None
+        for jobs in opts.jobs:
+            output_file = os.path.join(temp_dir, "output_%d.csv" % jobs)
+            begin = time.perf_counter()
+            reorder(input_file, output_file, order, jobs)
+            elapsed = time.perf_counter() - begin
+
+            with open(output_file, "rb") as f:
+                output = f.read()
+            if expected is None:
+                expected = output
+            assert output == expected, "output with %d jobs differs" % jobs
+
+            print("%d MB, %d jobs: %.2fs (%.1f MB/s)" % (size // 1024 ** 2, jobs, elapsed, size / elapsed / 1024 ** 2))
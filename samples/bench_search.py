@@ -0,0 +1,29 @@
+import random
+
+from bench.runner import best_of
+from binary_search import binary_search, iterative_binary_search, search_many
+
+def recursive_loop(items, queries):
+    for query in queries:
+        try:
+            binary_search(items, query)
+        except ValueError:
+            pass
+
+def iterative_loop(items, queries):
+    for query in queries:
+        iterative_binary_search(items, query, default=None)
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    for n in (1000, 100000):
+        items = sorted(rng.sample(range(n * 2), n))
+        # about half of the queries are misses
+        queries = [rng.randrange(n * 2) for i in range(10000)]
+
+        recursive = best_of(3, recursive_loop, items, queries)
+        iterative = best_of(3, iterative_loop, items, queries)
+        batch = best_of(3, search_many, items, queries)
+
+        print("%6d items, %d queries: recursive %.4fs, iterative %.4fs (%.1fx), search_many %.4fs (%.1fx)"
+              % (n, len(queries), recursive, iterative, recursive / iterative, batch, recursive / batch))
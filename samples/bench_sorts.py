@@ -0,0 +1,42 @@
+import random
+
+from bench.runner import best_of
+from merge_sort import merge_sort
+from hybrid_sort import hybrid_sort
+
+def random_input(n, rng):
+    return [rng.random() for i in range(n)]
+
+def sorted_input(n, rng):
+    return sorted(random_input(n, rng))
+
+def reversed_input(n, rng):
+    return sorted(random_input(n, rng), reverse=True)
+
+def nearly_sorted_input(n, rng):
+    items = sorted_input(n, rng)
+    # swap 1% of the items with a random neighbour
+    for i in range(n // 100):
+        j = rng.randrange(n - 1)
+        items[j], items[j + 1] = items[j + 1], items[j]
+    return items
+
+INPUTS = [
+    ("random", random_input),
+    ("sorted", sorted_input),
+    ("reversed", reversed_input),
+    ("nearly sorted", nearly_sorted_input),
+]
+
+SORTS = [
+    ("sorted()", sorted),
+    ("merge_sort", merge_sort),
+    ("hybrid_sort", hybrid_sort),
+]
+
+if __name__ == "__main__":
+    for n in (1000, 10000, 100000):
+        for input_name, make_input in INPUTS:
+            items = make_input(n, random.Random(n))
+            timings = ", ".join("%s %.4fs" % (sort_name, best_of(3, function, prepare=lambda: list(items))) for sort_name, function in SORTS)
+            print("%7d %-14s %s" % (n, input_name, timings))
@@ -0,0 +1,103 @@
+"""Measure how long the command-line samples take to start, and fail if any
+   of them has become slower than its recorded budget. Each program is
+   launched several times and the median wall-clock time is taken, and its
+   imports are timed with python -X importtime. Use --record to save the
+   current timings as the new budget -- budgets depend on the machine, so
+   record them on the machine which runs the check.
+   """
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_FILE = os.path.join(SAMPLES_DIR, "startup_budget.json")
+
+
+def programs(temp_dir):
+    input_file = os.path.join(temp_dir, "input.csv")
+    with open(input_file, "w") as f:
+        f.write("a,b,c\n1,2,3\n4,5,6\n")
+
+    return {
+        "argtest": (["argtest.py", "3", "4", "add"], None),
+        "argtest2": (["argtest2.py", input_file, "2,0", "-o", os.path.join(temp_dir, "output.csv")], None),
+        "estimate": ([os.path.join("estimate", "estimate.py")], "18:30:00\n40:00\nY\nN\n"),
+    }
+
+
+def launch(args, stdin, *options):
+    return subprocess.run([sys.executable] + list(options) + args, input=stdin, cwd=SAMPLES_DIR,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+
+def import_time_ms(args, stdin):
+    """Return the total time spent importing modules, in milliseconds."""
+    stderr = launch(args, stdin, "-X", "importtime").stderr
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # only count top-level imports, since their cumulative times include the nested ones
+        if cumulative_us.strip().isdigit() and not name.startswith("  "):
+            total += int(cumulative_us)
+    return total / 1000.0
+
+
+def wall_time_ms(args, stdin, launches):
+    times = []
+    for i in range(launches):
+        begin = time.perf_counter()
+        launch(args, stdin)
+        times.append(time.perf_counter() - begin)
+    return statistics.median(times) * 1000.0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--launches", help="the number of launches to time", type=int, default=20)
+    parser.add_argument("-t", "--tolerance", help="the allowed slowdown over the budget, as a fraction",
+                        type=float, default=0.25)
+    parser.add_argument("--record", help="save the timings as the new budget", action="store_true")
+
+    opts = parser.parse_args()
+
+    try:
+        with open(BUDGET_FILE) as f:
+            budget = json.load(f)
+    except FileNotFoundError:
+        budget = {}
+
+    results = {}
+    failures = []
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, (args, stdin) in sorted(programs(temp_dir).items()):
+            results[name] = {
+                "wall_ms": round(wall_time_ms(args, stdin, opts.launches), 2),
+                "import_ms": round(import_time_ms(args, stdin), 2),
+            }
+
+            for measure, value in sorted(results[name].items()):
+                limit = budget.get(name, {}).get(measure)
+                if limit is None:
+                    status = "no budget"
+                elif value > limit * (1 + opts.tolerance):
+                    status = "OVER BUDGET (%.2f ms)" % limit
+                    failures.append("%s %s" % (name, measure))
+                else:
+                    status = "ok (%.2f ms)" % limit
+                print("%-9s %-9s %8.2f ms  %s" % (name, measure, value, status))
+
+    if opts.record:
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print("Recorded the budget in %s" % BUDGET_FILE)
+    elif failures:
+        sys.exit("Start-up time over budget: %s" % ", ".join(failures))
@@ -1,3 +1,11 @@
+from profiling import profile
+
+try:
+    import numpy
+except ImportError: # search_many only uses NumPy for NumPy arrays
+    numpy = None
+
+@profile
 def binary_search(items, desired_item, start=0, end=None):
     if end == None:
         end = len(items)
@@ -14,10 +22,123 @@ def binary_search(items, desired_item, start=0, end=None):
     else: # desired_item < items[pos]:
         return binary_search(items, desired_item, start=start, end=pos)
 
-print(binary_search([1,2,3,4,5], 3))
-print(binary_search([1,2,3,4,5,6], 3))
-print(binary_search([1,2,3,4], 3))
-print(binary_search([1,2,3], 3))
 
+# Passed as the default to make a miss raise ValueError instead of returning a value
+RAISE = object()
+
+def search_left(items, desired_item, start=0, end=None, key=None):
+    """Return the first position in items[start:end] where desired_item could
+       be inserted while keeping the list sorted, like bisect.bisect_left. If
+       key is given, desired_item is compared with key(item) for each item.
+       """
+    if end is None:
+        end = len(items)
+
+    if key is None:
+        while start < end:
+            pos = (start + end) // 2
+            if items[pos] < desired_item:
+                start = pos + 1
+            else:
+                end = pos
+    else:
+        while start < end:
+            pos = (start + end) // 2
+            if key(items[pos]) < desired_item:
+                start = pos + 1
+            else:
+                end = pos
+
+    return start
+
+def search_right(items, desired_item, start=0, end=None, key=None):
+    """Like search_left, but return the position after any items equal to
+       desired_item, like bisect.bisect_right.
+       """
+    if end is None:
+        end = len(items)
+
+    if key is None:
+        while start < end:
+            pos = (start + end) // 2
+            if desired_item < items[pos]:
+                end = pos
+            else:
+                start = pos + 1
+    else:
+        while start < end:
+            pos = (start + end) // 2
+            if desired_item < key(items[pos]):
+                end = pos
+            else:
+                start = pos + 1
+
+    return start
+
+def iterative_binary_search(items, desired_item, start=0, end=None, key=None, default=RAISE):
+    """Return the position of the first item equal to desired_item. On a miss
+       this raises ValueError, like binary_search, unless a default is given,
+       in which case the default is returned.
+       """
+    if end is None:
+        end = len(items)
+
+    pos = search_left(items, desired_item, start, end, key)
+    if pos < end:
+        item = items[pos] if key is None else key(items[pos])
+        if item == desired_item:
+            return pos
+
+    if default is RAISE:
+        raise ValueError("%s was not found in the list." % desired_item)
+    return default
+
+def search_many(sorted_items, queries, key=None, default=None):
+    """Look up many items at once, and return a list of their positions in
+       sorted_items, with default for each one which is missing. The queries
+       are sorted, so that each search can start where the previous one
+       stopped. NumPy arrays are searched with numpy.searchsorted.
+       """
+    n = len(sorted_items)
+
+    if numpy is not None and key is None and isinstance(sorted_items, numpy.ndarray):
+        queries = numpy.asarray(queries)
+        positions = numpy.searchsorted(sorted_items, queries, side='left')
+        found = positions < n
+        found[found] = sorted_items[positions[found]] == queries[found]
+        return [int(pos) if hit else default for pos, hit in zip(positions, found)]
+
+    queries = list(queries)
+    results = [default] * len(queries)
+    # visit the queries in ascending order, but remember where each one came from
+    order = sorted(range(len(queries)), key=queries.__getitem__)
+
+    pos = 0
+    if len(queries) * n.bit_length() < n:
+        # few queries: binary search each one in what is left of the list
+        for i in order:
+            pos = search_left(sorted_items, queries[i], pos, n, key)
+            if pos < n and (sorted_items[pos] if key is None else key(sorted_items[pos])) == queries[i]:
+                results[i] = pos
+    else:
+        # many queries: walk through both sorted sequences together
+        for i in order:
+            desired_item = queries[i]
+            while pos < n and (sorted_items[pos] if key is None else key(sorted_items[pos])) < desired_item:
+                pos += 1
+            if pos < n and (sorted_items[pos] if key is None else key(sorted_items[pos])) == desired_item:
+                results[i] = pos
+
+    return results
+
+if __name__ == "__main__":
+    print(binary_search([1,2,3,4,5], 3))
+    print(binary_search([1,2,3,4,5,6], 3))
+    print(binary_search([1,2,3,4], 3))
+    print(binary_search([1,2,3], 3))
+
+    # print(binary_search([1,2,3,4,5], 6))
 
-# print(binary_search([1,2,3,4,5], 6))
+    print(iterative_binary_search([1,2,3,4,5], 6, default=-1))
+    print(search_left([1,2,2,2,3], 2), search_right([1,2,2,2,3], 2))
+    print(search_many([1,2,3,4,5], [5, 0, 3]))
@@ -1,4 +1,88 @@
-from tkinter import Tk, Label, Button, Entry, IntVar, END, W, E
+import decimal
+import re
+from decimal import Decimal
+from tkinter import Tk, Label, Button, Entry, StringVar, TclError, DISABLED, NORMAL, END, W, E
+# ourprog has to be installed, as in the packaging chapter, or be on the
+# path: PYTHONPATH=ourprog python calculator.py
+from ourprog.gui import BackgroundTasks
+
+# Numbers are kept as integral Decimals, which can have any number of digits:
+# with this much precision, adding and subtracting them is always exact, and
+# unlike int they convert to and from text in linear time and without the
+# interpreter's limit on the length of integer strings
+EXACT = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN, traps=[decimal.Inexact])
+ZERO = Decimal(0)
+
+NUMBER = re.compile(r"([-+]?)([0-9]*)")
+DIGITS = re.compile(r"[0-9]+")
+
+class NumberInput:
+    """Keeps track of the integer which is being typed into an entry field.
+       Typing or deleting digits at the end of the number, which is what
+       usually happens, updates the value from the digits which changed
+       instead of parsing the whole text again.
+       """
+
+    def __init__(self):
+        self.text = ""
+        self.negative = False
+        self.magnitude = ZERO
+
+    @property
+    def value(self):
+        return EXACT.minus(self.magnitude) if self.negative else self.magnitude
+
+    def edit(self, new_text):
+        """Update the value for the new text, and return whether the text is
+           a number or the start of one. Invalid text leaves the value as it was.
+           """
+        old_text = self.text
+
+        if len(new_text) > len(old_text) and new_text.startswith(old_text) and old_text.lstrip("-+"):
+            added = new_text[len(old_text):]
+            if not DIGITS.fullmatch(added):
+                return False
+            self.magnitude = EXACT.add(EXACT.scaleb(self.magnitude, len(added)), EXACT.create_decimal(added))
+
+        elif len(new_text) < len(old_text) and old_text.startswith(new_text) and new_text.lstrip("-+"):
+            removed = len(old_text) - len(new_text)
+            self.magnitude = EXACT.scaleb(self.magnitude, -removed).to_integral_value(decimal.ROUND_DOWN, EXACT)
+
+        else: # anything else, like an edit in the middle, or a sign being added or removed
+            match = NUMBER.fullmatch(new_text)
+            if not match:
+                return False
+            sign, digits = match.groups()
+            self.negative = sign == "-"
+            self.magnitude = EXACT.create_decimal(digits) if digits else ZERO
+
+        self.text = new_text
+        return True
+
+def calculate(method, total, number):
+    # this runs on a worker thread, since arithmetic on very large numbers can be slow
+    if method == "add":
+        return EXACT.add(total, number)
+    elif method == "subtract":
+        return EXACT.subtract(total, number)
+    else: # reset
+        return ZERO
+
+def sum_column(text):
+    """Return the sum of a column of integers, one on each line. Blank lines are skipped."""
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]
+
+    for line_number, line in enumerate(lines, 1):
+        match = NUMBER.fullmatch(line)
+        if not match or not match.group(2):
+            raise ValueError("Line %d is not a number: %.20s" % (line_number, line))
+
+    with decimal.localcontext(EXACT):
+        return sum(map(Decimal, lines), ZERO)
+
+def add_column(total, text):
+    return EXACT.add(total, sum_column(text))
 
 class Calculator:
 
@@ -6,11 +90,13 @@ class Calculator:
         self.master = master
         master.title("Calculator")
 
-        self.total = 0
-        self.entered_number = 0
+        self.total = ZERO
+        self.number_input = NumberInput()
+        self.tasks = BackgroundTasks(master)
 
-        self.total_label_text = IntVar()
-        self.total_label_text.set(self.total)
+        # a StringVar, since an IntVar cannot hold integers bigger than Tk's
+        self.total_label_text = StringVar()
+        self.total_label_text.set(str(self.total))
         self.total_label = Label(master, textvariable=self.total_label_text)
 
         self.label = Label(master, text="Total:")
@@ -21,6 +107,7 @@ class Calculator:
         self.add_button = Button(master, text="+", command=lambda: self.update("add"))
         self.subtract_button = Button(master, text="-", command=lambda: self.update("subtract"))
         self.reset_button = Button(master, text="Reset", command=lambda: self.update("reset"))
+        self.paste_button = Button(master, text="Add pasted column", command=self.paste_column)
 
         # LAYOUT
 
@@ -33,28 +120,47 @@ class Calculator:
         self.subtract_button.grid(row=2, column=1)
         self.reset_button.grid(row=2, column=2, sticky=W+E)
 
-    def validate(self, new_text):
-        if not new_text: # the field is being cleared
-            self.entered_number = 0
-            return True
+        self.paste_button.grid(row=3, column=0, columnspan=3, sticky=W+E)
 
-        try:
-            self.entered_number = int(new_text)
-            return True
-        except ValueError:
-            return False
+    def validate(self, new_text):
+        return self.number_input.edit(new_text)
 
     def update(self, method):
-        if method == "add":
-            self.total += self.entered_number
-        elif method == "subtract":
-            self.total -= self.entered_number
-        else: # reset
-            self.total = 0
-
-        self.total_label_text.set(self.total)
+        # the buttons are disabled until the result arrives, so that every
+        # calculation starts from the total left by the one before it
+        self.set_buttons(DISABLED)
+        self.tasks.submit(calculate, method, self.total, self.number_input.value, on_done=self.show_total)
         self.entry.delete(0, END)
 
-root = Tk()
-my_gui = Calculator(root)
-root.mainloop()
\ No newline at end of file
+    def paste_column(self):
+        # add up a whole column of numbers copied from elsewhere, one on each line, in one go
+        try:
+            text = self.master.clipboard_get()
+        except TclError: # the clipboard is empty
+            return
+
+        self.set_buttons(DISABLED)
+        self.tasks.submit(add_column, self.total, text, on_done=self.show_total, on_error=self.show_error)
+
+    def show_total(self, total):
+        self.total = total
+        self.total_label_text.set(str(self.total))
+        self.set_buttons(NORMAL)
+
+    def show_error(self, error):
+        self.total_label_text.set(str(error))
+        self.set_buttons(NORMAL)
+
+    def set_buttons(self, state):
+        for button in (self.add_button, self.subtract_button, self.reset_button, self.paste_button):
+            button.configure(state=state)
+
+    def close(self):
+        self.tasks.shutdown()
+        self.master.destroy()
+
+if __name__ == "__main__":
+    root = Tk()
+    my_gui = Calculator(root)
+    root.protocol("WM_DELETE_WINDOW", my_gui.close)
+    root.mainloop()
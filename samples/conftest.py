@@ -0,0 +1,6 @@
+# The samples which use ourprog import it as if it were installed. Put the
+# package in ourprog/ on the path for the tests, as PYTHONPATH=ourprog would.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "ourprog"))
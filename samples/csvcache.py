@@ -0,0 +1,188 @@
+import argparse
+import array
+import csv
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+
+from argtest2 import BUFFER_SIZE, AtomicOutput, parse_order, projection
+
+# Rows handled at a time when ingesting and when writing a projection
+CHUNK_ROWS = 10000
+
+
+def cache_dir_for(input_file):
+    return input_file + ".columns"
+
+
+def source_signature(input_file):
+    stat = os.stat(input_file)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def ingest(input_file, cache_dir=None):
+    """Parse a CSV file once and store it as columns: for each column, a data
+       file with all its fields as UTF-8, one after another, and an offsets
+       file of 64-bit integers marking where each field starts (with one more
+       offset at the end). The header is stored as row 0, and also in the
+       cache's metadata so that columns can be found by name. The cache
+       records the size and modification time of the CSV file, so that it can
+       tell when it is out of date.
+       """
+    cache_dir = cache_dir or cache_dir_for(input_file)
+    signature = source_signature(input_file)
+    parent = os.path.dirname(os.path.abspath(cache_dir))
+    temp_dir = tempfile.mkdtemp(dir=parent, prefix=".columns-")
+
+    try:
+        with open(input_file, newline='') as f_in:
+            r = csv.reader(f_in)
+            header = next(r, None)
+            width = len(header) if header is not None else 0
+
+            data_files = [open(os.path.join(temp_dir, "%d.data" % i), "wb", buffering=BUFFER_SIZE) for i in range(width)]
+            offset_files = [open(os.path.join(temp_dir, "%d.offsets" % i), "wb") for i in range(width)]
+            try:
+                positions = [0] * width
+                for f in offset_files:
+                    array.array('q', [0]).tofile(f)
+
+                rows = 0
+                batch = [header] if header is not None else []
+                for row in r:
+                    if len(row) < width:
+                        raise ValueError("Line %d has fewer columns than the first row." % r.line_num)
+                    batch.append(row)
+                    if len(batch) == CHUNK_ROWS:
+                        rows += _write_batch(batch, data_files, offset_files, positions)
+                        batch = []
+                rows += _write_batch(batch, data_files, offset_files, positions)
+            finally:
+                for f in data_files + offset_files:
+                    f.close()
+
+        with open(os.path.join(temp_dir, "meta.json"), "w") as f:
+            json.dump({"source": signature, "rows": rows, "width": width, "header": header}, f)
+
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir)
+        os.rename(temp_dir, cache_dir)
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    return cache_dir
+
+
+def _write_batch(batch, data_files, offset_files, positions):
+    for i, (data_file, offset_file) in enumerate(zip(data_files, offset_files)):
+        fields = [row[i].encode("utf-8") for row in batch]
+        offsets = array.array('q')
+        position = positions[i]
+        for field in fields:
+            position += len(field)
+            offsets.append(position)
+        positions[i] = position
+        data_file.write(b"".join(fields))
+        offsets.tofile(offset_file)
+    return len(batch)
+
+
+def open_cache(input_file, cache_dir=None):
+    """Return the cache's metadata, or None if there is no cache or the CSV
+       file has changed since it was made.
+       """
+    cache_dir = cache_dir or cache_dir_for(input_file)
+    try:
+        with open(os.path.join(cache_dir, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta["source"] != source_signature(input_file):
+        return None
+    return meta
+
+
+class Column:
+    """One column of the cache, memory-mapped."""
+
+    def __init__(self, cache_dir, i):
+        self._files = [open(os.path.join(cache_dir, "%d.%s" % (i, kind)), "rb") for kind in ("data", "offsets")]
+        self._maps = [mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+                      for f in self._files]
+        self.data, offsets = self._maps
+        self.offsets = memoryview(offsets).cast('q')
+
+    def fields(self, start, end):
+        """Return the fields of rows start to end as strings."""
+        offsets = self.offsets[start:end + 1].tolist()
+        base = offsets[0]
+        chunk = self.data[base:offsets[-1]]
+        return [chunk[a - base:b - base].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+
+    def close(self):
+        self.offsets.release()
+        for m in self._maps:
+            if isinstance(m, mmap.mmap):
+                m.close()
+        for f in self._files:
+            f.close()
+
+
+def reorder_cached(input_file, output_file, order_str, cache_dir=None):
+    """Like argtest2.reorder, but read the columns from the cache, which is
+       built or rebuilt first if necessary. Only the requested columns are
+       read.
+       """
+    cache_dir = cache_dir or cache_dir_for(input_file)
+    meta = open_cache(input_file, cache_dir)
+    if meta is None:
+        ingest(input_file, cache_dir)
+        meta = open_cache(input_file, cache_dir)
+
+    rows, width = meta["rows"], meta["width"]
+
+    if rows:
+        indices = parse_order(order_str, meta["header"])
+        projection(indices, width) # checks the indices
+
+    with AtomicOutput(output_file) as temp_file:
+        with open(temp_file, "w", newline='', buffering=BUFFER_SIZE) as f_out:
+            if rows == 0:
+                return
+
+            # each column is only opened once, however many times it is used
+            columns = {}
+            try:
+                for i in indices:
+                    if i % width not in columns:
+                        columns[i % width] = Column(cache_dir, i % width)
+                selected = [columns[i % width] for i in indices]
+
+                w = csv.writer(f_out)
+                for start in range(0, rows, CHUNK_ROWS):
+                    end = min(start + CHUNK_ROWS, rows)
+                    w.writerows(zip(*[c.fields(start, end) for c in selected]))
+            finally:
+                for c in columns.values():
+                    c.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="the CSV file to convert into a column cache")
+    parser.add_argument("-d", "--cache-dir", help="where to put the cache; next to the input by default")
+
+    opts = parser.parse_args()
+
+    try:
+        if open_cache(opts.input, opts.cache_dir) is None:
+            print("Cached columns in %s" % ingest(opts.input, opts.cache_dir))
+        else:
+            print("The cache is up to date.")
+    except ValueError as e:
+        sys.exit(str(e))
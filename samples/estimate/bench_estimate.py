@@ -0,0 +1,38 @@
+import random
+
+from estimate import price_estimate, price_estimates
+
+def make_calls(n, seed=0):
+    rng = random.Random(seed)
+    starts = [rng.randrange(86400) for i in range(n)]
+    durations = [rng.randrange(3600) for i in range(n)]
+    far = [rng.random() < 0.5 for i in range(n)]
+    share = [rng.random() < 0.5 for i in range(n)]
+    return starts, durations, far, share
+
+def as_strings(starts, durations, far, share):
+    return [
+        ("%02d:%02d:%02d" % (s // 3600, s // 60 % 60, s % 60), "%02d:%02d" % (d // 60, d % 60),
+         "Y" if f else "N", "Y" if c else "N")
+        for s, d, f, c in zip(starts, durations, far, share)
+    ]
+
+def scalar_loop(calls):
+    for call in calls:
+        price_estimate(*call)
+
+if __name__ == "__main__":
+    import os
+    import sys
+    # the bench package is in the samples directory, one level up
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from bench.runner import best_of
+
+    for n in (1000, 10000, 100000):
+        columns = make_calls(n)
+        calls = as_strings(*columns)
+
+        scalar = best_of(3, scalar_loop, calls)
+        batch = best_of(3, price_estimates, *columns)
+
+        print("%7d calls: scalar %.4fs, batch %.4fs, speedup %.1fx" % (n, scalar, batch, scalar / batch))
@@ -1,4 +1,30 @@
+import array
 import datetime
+import functools
+
+try:
+    from profiling import profile
+except ImportError:
+    # profiling.py is in the samples directory, one level up, so to profile
+    # this program from here, run it with PYTHONPATH=..
+    def profile(function):
+        return function
+
+# NumPy takes longer to import than pricing a single call takes, so it is
+# only imported once a batch of calls is priced
+numpy = None
+_numpy_imported = False
+
+def _import_numpy():
+    global numpy, _numpy_imported
+
+    if not _numpy_imported:
+        _numpy_imported = True
+        try:
+            import numpy
+        except ImportError: # price_estimates falls back to the array module
+            numpy = None
+    return numpy
 
 # The first value in each tuple is for distances <= 50km
 # The second value is for distances > 50km
@@ -16,37 +42,92 @@ HOUR_BEFORE_OFF_PEAK_END = datetime.time(6, 0, 0)
 
 VAT_RATE = 0.14
 
+SECONDS_PER_DAY = 24 * 60 * 60
+
+_split_indexes = {}
+_current_split_index = (None, None)
+
+def _seconds(t):
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+def _build_split_index(off_peak_start, hour_before_off_peak_start, off_peak_end, hour_before_off_peak_end):
+    # For every start second we store whether the call starts in peak time and
+    # how long it can last before it crosses into the other period.
+    starts_in_peak = bytearray(SECONDS_PER_DAY)
+    first_period = array.array('d', [float('inf')]) * SECONDS_PER_DAY
+
+    for start in range(SECONDS_PER_DAY):
+        if off_peak_end <= start <= hour_before_off_peak_start:
+            # whole call fits in peak time
+            starts_in_peak[start] = 1
+        elif start >= off_peak_start or start <= hour_before_off_peak_end:
+            # whole call fits in off-peak time
+            pass
+        else:
+            # call starts within hour of peak/off-peak boundary
+            starts_in_peak[start] = start >= off_peak_end
+            first_period[start] = 3600 - (start // 60 % 60) * 60 + start % 60
+
+    return starts_in_peak, first_period
+
+def _split_index_for(key):
+    if key not in _split_indexes:
+        _split_indexes[key] = _build_split_index(*[_seconds(t) for t in key])
+    return _split_indexes[key]
+
+def split_index():
+    """Return the (starts_in_peak, first_period) tables for the current
+       peak / off-peak boundaries, building them the first time they are used.
+       """
+    global _current_split_index
+
+    key, index = _current_split_index
+    # the boundaries are only looked up again if one of them has been replaced
+    if key is not None and key[0] is OFF_PEAK_START and key[1] is HOUR_BEFORE_OFF_PEAK_START \
+            and key[2] is OFF_PEAK_END and key[3] is HOUR_BEFORE_OFF_PEAK_END:
+        return index
+
+    key = OFF_PEAK_START, HOUR_BEFORE_OFF_PEAK_START, OFF_PEAK_END, HOUR_BEFORE_OFF_PEAK_END
+    _current_split_index = key, _split_index_for(key)
+    return _current_split_index[1]
+
+def split_seconds(start, duration):
+    """Split a call starting at the given second after midnight into its peak
+       and off-peak seconds.
+       """
+    starts_in_peak, first_period = split_index()
+    first = min(duration, first_period[start])
+    if starts_in_peak[start]:
+        return first, duration - first
+    return duration - first, first
+
+# A day has only SECONDS_PER_DAY distinct start times, so we remember them all
+@functools.lru_cache(maxsize=SECONDS_PER_DAY)
+def parse_time(time_str):
+    """Parse a HH:MM:SS string into seconds after midnight."""
+    h, m, s = time_str.split(":")
+    h, m, s = int(h), int(m), int(s)
+    if not (0 <= h < 24 and 0 <= m < 60 and 0 <= s < 60):
+        raise ValueError("time data %r does not match format '%%H:%%M:%%S'" % time_str)
+    return h * 3600 + m * 60 + s
+
+@functools.lru_cache(maxsize=4096)
+def parse_duration(duration_str):
+    """Parse a MM:SS string into a number of seconds."""
+    d_m, d_s = duration_str.split(":")
+    return float(int(d_m) * 60 + int(d_s))
+
+@profile
 def price_estimate(start_str, duration_str, destination_str, share_call_str):
-    start = datetime.datetime.strptime(start_str, "%H:%M:%S").time()
-    d_m, d_s = [int(p) for p in duration_str.split(":")]
-    duration = datetime.timedelta(minutes=d_m, seconds=d_s).total_seconds()
+    start = parse_time(start_str)
+    duration = parse_duration(duration_str)
     # We set the destination to an index value we can use with the tuple constants
     destination = FAR if destination_str.lower() == 'y' else NEAR
-    share_call = True if share_call_str.lower() == 'y' else False
+    share_call = share_call_str.lower() == 'y'
 
-    peak_seconds = 0
-    off_peak_seconds = 0
-
-    if start >= OFF_PEAK_END and start <= HOUR_BEFORE_OFF_PEAK_START:
-        # whole call fits in peak time
-        peak_seconds = duration
-    elif start >= OFF_PEAK_START or start <= HOUR_BEFORE_OFF_PEAK_END:
-        # whole call fits in off-peak time
-        off_peak_seconds = duration
-    else:
-        # call starts within hour of peak/off-peak boundary
-        secs_left_in_hour = 3600 - start.minute * 60 + start.second
-
-        if start < OFF_PEAK_END:
-            # call starts in off-peak time
-            if duration > secs_left_in_hour:
-                peak_seconds = duration - secs_left_in_hour
-            off_peak_seconds = duration - peak_seconds
-        else:
-            # call starts in peak time
-            if duration > secs_left_in_hour:
-                off_peak_seconds = duration - secs_left_in_hour
-            peak_seconds = duration - off_peak_seconds
+    starts_in_peak, first_period = split_index()
+    first = min(duration, first_period[start])
+    off_peak_seconds = duration - first if starts_in_peak[start] else first
 
     basic = CHARGE_PER_SEC[destination] * duration
     offpeak_discount = OFFPEAK_DISCOUNT[destination] * CHARGE_PER_SEC[destination] * off_peak_seconds
@@ -64,6 +145,175 @@ def price_estimate(start_str, duration_str, destination_str, share_call_str):
 
     return basic, offpeak_discount, share_call_discount, net, vat, total
 
+class Tariff:
+    """A tariff plan: the rate constants above, bundled together so that
+       several plans can be used side by side. Any constant which is not given
+       is taken from the module globals.
+       """
+    FIELDS = ('min_charge', 'charge_per_sec', 'offpeak_discount', 'sharecall_discount',
+              'off_peak_start', 'hour_before_off_peak_start', 'off_peak_end', 'hour_before_off_peak_end',
+              'vat_rate')
+    PAIRS = ('min_charge', 'charge_per_sec', 'offpeak_discount', 'sharecall_discount')
+    TIMES = ('off_peak_start', 'hour_before_off_peak_start', 'off_peak_end', 'hour_before_off_peak_end')
+
+    def __init__(self, name="default", **constants):
+        unknown = set(constants) - set(self.FIELDS)
+        if unknown:
+            raise TypeError("Unknown tariff constants: %s" % ", ".join(sorted(unknown)))
+
+        self.name = name
+        for field in self.FIELDS:
+            value = constants.get(field)
+            setattr(self, field, globals()[field.upper()] if value is None else value)
+
+        self._evaluator = None
+
+    @classmethod
+    def load(cls, filename):
+        """Read tariffs from an INI-style config file with one section per
+           tariff, and return them in a dictionary keyed by section name.
+           Pairs of near / far values are comma-separated, and times are
+           written as HH:MM:SS.
+           """
+        import configparser
+
+        config = configparser.ConfigParser()
+        with open(filename) as f:
+            config.read_file(f)
+
+        tariffs = {}
+        for name in config.sections():
+            constants = {}
+            for field, value in config.items(name):
+                if field in cls.PAIRS:
+                    near, far = [float(p) for p in value.split(",")]
+                    constants[field] = near, far
+                elif field in cls.TIMES:
+                    constants[field] = datetime.datetime.strptime(value.strip(), "%H:%M:%S").time()
+                elif field in cls.FIELDS:
+                    constants[field] = float(value)
+                else:
+                    raise ValueError("Unknown tariff constant in section [%s]: %s" % (name, field))
+            tariffs[name] = cls(name, **constants)
+
+        return tariffs
+
+    def boundaries(self):
+        return tuple(getattr(self, field) for field in self.TIMES)
+
+    def compile(self):
+        """Return a function which prices one call with this tariff, given
+           the start in seconds after midnight, the duration in seconds and
+           the far destination and share-call flags. All the constants are
+           bound into the function once, so pricing a call does no attribute
+           lookups or tuple indexing.
+           """
+        if self._evaluator is not None:
+            return self._evaluator
+
+        near_min_charge, far_min_charge = self.min_charge
+        near_charge_per_sec, far_charge_per_sec = self.charge_per_sec
+        near_offpeak_rate = self.offpeak_discount[NEAR] * near_charge_per_sec
+        far_offpeak_rate = self.offpeak_discount[FAR] * far_charge_per_sec
+        near_sharecall_discount, far_sharecall_discount = self.sharecall_discount
+        vat_rate = self.vat_rate
+        starts_in_peak, first_period = _split_index_for(self.boundaries())
+
+        def price(start, duration, far, share_call):
+            if far:
+                charge_per_sec, offpeak_rate, sharecall_discount, min_charge = \
+                    far_charge_per_sec, far_offpeak_rate, far_sharecall_discount, far_min_charge
+            else:
+                charge_per_sec, offpeak_rate, sharecall_discount, min_charge = \
+                    near_charge_per_sec, near_offpeak_rate, near_sharecall_discount, near_min_charge
+
+            first = min(duration, first_period[start])
+            off_peak_seconds = duration - first if starts_in_peak[start] else first
+
+            basic = charge_per_sec * duration
+            offpeak_discount = offpeak_rate * off_peak_seconds
+            if share_call:
+                share_call_discount = sharecall_discount * (basic - offpeak_discount)
+            else:
+                share_call_discount = 0
+            net = basic - offpeak_discount - share_call_discount
+
+            if net < min_charge:
+                net = min_charge
+
+            vat = vat_rate * net
+            return basic, offpeak_discount, share_call_discount, net, vat, net + vat
+
+        self._evaluator = price
+        return price
+
+def _price_tariffs_numpy(tariffs, starts, durations, far, share):
+    start = numpy.asarray(starts, dtype=numpy.intp)
+    duration = numpy.asarray(durations, dtype=numpy.float64)
+    destination = numpy.asarray(far, dtype=bool).astype(numpy.intp)
+    share_call = numpy.asarray(share, dtype=bool)
+
+    # One row per tariff, so every operation below prices all the tariffs at once
+    def constant(field):
+        return numpy.array([getattr(tariff, field) for tariff in tariffs])[:, destination]
+
+    min_charge = constant('min_charge')
+    charge_per_sec = constant('charge_per_sec')
+    offpeak_rate = constant('offpeak_discount')
+    sharecall_rate = constant('sharecall_discount')
+    vat_rate = numpy.array([tariff.vat_rate for tariff in tariffs])[:, numpy.newaxis]
+
+    indexes = [_split_index_for(tariff.boundaries()) for tariff in tariffs]
+    starts_in_peak = numpy.array([numpy.frombuffer(index[0], dtype=bool)[start] for index in indexes])
+    first_period = numpy.array([numpy.frombuffer(index[1], dtype=numpy.float64)[start] for index in indexes])
+
+    first = numpy.minimum(duration, first_period)
+    off_peak_seconds = numpy.where(starts_in_peak, duration - first, first)
+
+    basic = charge_per_sec * duration
+    offpeak_discount = offpeak_rate * charge_per_sec * off_peak_seconds
+    share_call_discount = numpy.where(share_call, sharecall_rate * (basic - offpeak_discount), 0.0)
+    net = basic - offpeak_discount - share_call_discount
+    net = numpy.where(net < min_charge, min_charge, net)
+
+    vat = vat_rate * net
+    total = net + vat
+
+    return [tuple(column[i] for column in (basic, offpeak_discount, share_call_discount, net, vat, total))
+            for i in range(len(tariffs))]
+
+def _price_tariffs_array(tariffs, starts, durations, far, share):
+    evaluators = [tariff.compile() for tariff in tariffs]
+    results = [tuple(array.array('d') for i in range(6)) for tariff in tariffs]
+    appends = [[column.append for column in columns] for columns in results]
+
+    for start, duration, destination, share_call in zip(starts, durations, far, share):
+        duration = float(duration)
+        for price, tariff_appends in zip(evaluators, appends):
+            for append, value in zip(tariff_appends, price(start, duration, destination, share_call)):
+                append(value)
+
+    return results
+
+def price_tariffs(tariffs, starts, durations, far, share):
+    """Price one batch of calls, given as for price_estimates, against several
+       tariffs in a single pass over the data. Returns a list with the six
+       result columns for each tariff.
+       """
+    tariffs = list(tariffs)
+    if _import_numpy() is not None:
+        return _price_tariffs_numpy(tariffs, starts, durations, far, share)
+    return _price_tariffs_array(tariffs, starts, durations, far, share)
+
+def price_estimates(starts, durations, far, share):
+    """Price a batch of calls given as columns: start times in seconds after
+       midnight, durations in seconds, and flags for far destinations and
+       share-calls. Returns the same six values as price_estimate, as six
+       columns -- NumPy arrays if NumPy is installed, otherwise arrays of
+       doubles.
+       """
+    return price_tariffs([Tariff()], starts, durations, far, share)[0]
+
 if __name__ == "__main__":
     start_str = input("Please enter the starting time of the call (HH:MM:SS): ")
     duration_str = input("Please enter the duration of the call (MM:SS): ")
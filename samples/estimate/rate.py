@@ -0,0 +1,60 @@
+import argparse
+import collections
+import csv
+import itertools
+import multiprocessing
+import os
+
+from estimate import parse_time, parse_duration, price_estimates
+
+def chunks(rows, chunk_size):
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def price_chunk(chunk):
+    # turn the chunk into columns, so that it can be priced in one batch
+    starts = [parse_time(row[0]) for row in chunk]
+    durations = [parse_duration(row[1]) for row in chunk]
+    far = [row[2].lower() == 'y' for row in chunk]
+    share = [row[3].lower() == 'y' for row in chunk]
+    prices = zip(*(column.tolist() for column in price_estimates(starts, durations, far, share)))
+    return [row + list(row_prices) for row, row_prices in zip(chunk, prices)]
+
+def rate(rows, chunk_size=10000, jobs=None):
+    """Yield each (start, duration, destination, share-call) row with its six
+       prices appended, in input order. Chunks of rows are priced in a pool of
+       worker processes, and only a few chunks per worker are in flight at any
+       time, so memory use does not grow with the size of the input.
+       """
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1:
+        for chunk in chunks(rows, chunk_size):
+            yield from price_chunk(chunk)
+        return
+
+    with multiprocessing.Pool(jobs) as pool:
+        pending = collections.deque()
+        for chunk in chunks(rows, chunk_size):
+            pending.append(pool.apply_async(price_chunk, (chunk,)))
+            if len(pending) >= jobs * 2:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="the input CSV file of start, duration, destination and share-call columns")
+    parser.add_argument("-o", "--output", help="the destination CSV file; standard output by default")
+    parser.add_argument("-c", "--chunk-size", help="the number of rows priced at once", type=int, default=10000)
+    parser.add_argument("-j", "--jobs", help="the number of worker processes; one per CPU by default", type=int)
+
+    opts = parser.parse_args()
+
+    with open(opts.input, newline='') as f_in:
+        with (open(opts.output, "w", newline='') if opts.output else open(1, "w", newline='', closefd=False)) as f_out:
+            w = csv.writer(f_out)
+            w.writerows(rate(csv.reader(f_in), opts.chunk_size, opts.jobs))
@@ -1,7 +1,14 @@
 import unittest
 import trace, sys
+import datetime
+import os
+import random
+import subprocess
+import tempfile
 
-from estimate import price_estimate
+import estimate
+from estimate import price_estimate, price_estimates, parse_time, parse_duration, split_seconds, Tariff, price_tariffs
+from rate import rate
 
 class TestEstimate(unittest.TestCase):
     def test_off_peak(self):
@@ -121,6 +128,142 @@ class TestEstimate(unittest.TestCase):
             self.assertAlmostEqual(vat, exp_vat)
             self.assertAlmostEqual(total, exp_total)
 
+class TestEstimates(unittest.TestCase):
+    def test_matches_price_estimate(self):
+        rng = random.Random(0)
+        # pick starts near every peak / off-peak boundary as well as anywhere in the day
+        starts = [rng.randrange(86400) for i in range(500)]
+        starts += [boundary + offset for boundary in (21600, 25200, 64800, 68400) for offset in range(-2, 3)]
+        starts += [86399, 0]
+        durations = [rng.randrange(3600) for start in starts]
+        far = [rng.random() < 0.5 for start in starts]
+        share = [rng.random() < 0.5 for start in starts]
+
+        columns = price_estimates(starts, durations, far, share)
+
+        for i, (start, duration, far_away, share_call) in enumerate(zip(starts, durations, far, share)):
+            expected = price_estimate(
+                "%02d:%02d:%02d" % (start // 3600, start // 60 % 60, start % 60),
+                "%02d:%02d" % (duration // 60, duration % 60),
+                "Y" if far_away else "N",
+                "Y" if share_call else "N")
+            self.assertEqual(tuple(float(column[i]) for column in columns), expected)
+
+    def test_empty(self):
+        columns = price_estimates([], [], [], [])
+        self.assertEqual(len(columns), 6)
+        for column in columns:
+            self.assertEqual(len(column), 0)
+
+class TestTariff(unittest.TestCase):
+    def setUp(self):
+        self.tariffs = Tariff.load(os.path.join(os.path.dirname(__file__), "tariffs.ini"))
+
+    def test_load(self):
+        self.assertEqual(sorted(self.tariffs), ["late_evening", "standard"])
+        late_evening = self.tariffs["late_evening"]
+        self.assertEqual(late_evening.charge_per_sec, (0.699, 1.599))
+        self.assertEqual(late_evening.off_peak_start, datetime.time(21, 0, 0))
+        self.assertEqual(late_evening.min_charge, estimate.MIN_CHARGE)
+
+        self.assertRaises(TypeError, Tariff, peak_rate=1.0)
+
+    def test_compile(self):
+        price = self.tariffs["standard"].compile()
+        for parameters in [("06:59:59", "59:59", "N", "N"), ("23:59:59", "10:00", "Y", "Y"), ("06:30:00", "00:01", "N", "N")]:
+            start, duration, far_away, share_call = parameters
+            self.assertEqual(price(parse_time(start), parse_duration(duration), far_away == "Y", share_call == "Y"),
+                             price_estimate(*parameters))
+
+    def test_price_tariffs(self):
+        rng = random.Random(0)
+        starts = [rng.randrange(86400) for i in range(200)]
+        durations = [rng.randrange(3600) for start in starts]
+        far = [rng.random() < 0.5 for start in starts]
+        share = [rng.random() < 0.5 for start in starts]
+        tariffs = [self.tariffs["standard"], self.tariffs["late_evening"]]
+
+        results = price_tariffs(tariffs, starts, durations, far, share)
+
+        self.assertEqual(len(results), 2)
+        for tariff, columns in zip(tariffs, results):
+            price = tariff.compile()
+            for i, call in enumerate(zip(starts, durations, far, share)):
+                self.assertEqual(tuple(float(column[i]) for column in columns), price(*call))
+
+class TestSplitIndex(unittest.TestCase):
+    def test_parse(self):
+        for time_str in ("00:00:00", "06:59:59", "7:0:1", "23:59:59"):
+            t = datetime.datetime.strptime(time_str, "%H:%M:%S").time()
+            self.assertEqual(parse_time(time_str), t.hour * 3600 + t.minute * 60 + t.second)
+        for time_str in ("24:00:00", "12:60:00", "12:00", "noon"):
+            self.assertRaises(ValueError, parse_time, time_str)
+
+        self.assertEqual(parse_duration("59:59"), 3599.0)
+        self.assertRaises(ValueError, parse_duration, "1:00:00")
+
+    def test_split_seconds(self):
+        self.assertEqual(split_seconds(parse_time("12:00:00"), 600.0), (600.0, 0))
+        self.assertEqual(split_seconds(parse_time("23:00:00"), 600.0), (0, 600.0))
+        self.assertEqual(split_seconds(parse_time("06:59:59"), 3599.0), (3480.0, 119.0))
+        self.assertEqual(split_seconds(parse_time("18:59:59"), 3599.0), (119.0, 3480.0))
+
+    def test_boundaries_changed(self):
+        off_peak_start = estimate.OFF_PEAK_START
+        hour_before_off_peak_start = estimate.HOUR_BEFORE_OFF_PEAK_START
+        try:
+            estimate.OFF_PEAK_START = datetime.time(20, 0, 0)
+            estimate.HOUR_BEFORE_OFF_PEAK_START = datetime.time(19, 0, 0)
+            self.assertEqual(split_seconds(parse_time("19:30:00"), 600.0), (600.0, 0))
+        finally:
+            estimate.OFF_PEAK_START = off_peak_start
+            estimate.HOUR_BEFORE_OFF_PEAK_START = hour_before_off_peak_start
+        self.assertEqual(split_seconds(parse_time("19:30:00"), 600.0), (0, 600.0))
+
+class TestRate(unittest.TestCase):
+    def test_keeps_input_order(self):
+        rows = [["%02d:00:00" % (i % 24), "%02d:00" % (i % 60), "Y" if i % 2 else "N", "N"] for i in range(100)]
+        expected = [row + list(price_estimate(*row)) for row in rows]
+
+        self.assertEqual(list(rate(iter(rows), chunk_size=7, jobs=1)), expected)
+        self.assertEqual(list(rate(iter(rows), chunk_size=7, jobs=2)), expected)
+
+    def test_standard_output(self):
+        here = os.path.dirname(os.path.abspath(__file__))
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", newline='', delete=False) as f:
+            f.write("10:00:00,05:00,N,N\r\n23:59:59,60:00,y,Y\r\n")
+        try:
+            process = subprocess.run([sys.executable, "rate.py", f.name, "-j", "1"], cwd=here, stdout=subprocess.PIPE,
+                                     check=True)
+        finally:
+            os.remove(f.name)
+        # csv.writer ends each row with \r\n itself, which must not be translated again
+        lines = process.stdout.split(b"\r\n")
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[-1], b"")
+        self.assertFalse(any(b"\r" in line or b"\n" in line for line in lines))
+        self.assertTrue(lines[1].startswith(b"23:59:59,60:00,y,Y,"))
+
+class TestProfiling(unittest.TestCase):
+    def test_profile_report(self):
+        # run from this directory, with profiling.py put on the path by PYTHONPATH
+        here = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ, SAMPLES_PROFILE="1", PYTHONPATH=os.path.dirname(here))
+        process = subprocess.run([sys.executable, "estimate.py"], cwd=here, env=env, input="10:00:00\n5:00\nN\nN\n",
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+        self.assertIn("Total cost", process.stdout)
+        self.assertIn("price_estimate", process.stderr)
+
+    def test_without_profiling(self):
+        # without profiling.py on the path, estimate still imports, and leaves the path alone
+        here = os.path.dirname(os.path.abspath(__file__))
+        env = dict(os.environ)
+        env.pop("PYTHONPATH", None)
+        code = "import sys; path = list(sys.path); import estimate; assert sys.path == path; print(estimate.profile(len) is len)"
+        process = subprocess.run([sys.executable, "-c", code], cwd=here, env=env, stdout=subprocess.PIPE,
+                                 universal_newlines=True, check=True)
+        self.assertEqual(process.stdout, "True\n")
+
 if __name__ == "__main__":
     t = trace.Trace(ignoredirs=[sys.prefix, sys.exec_prefix], count=1, trace=0)
     t.runfunc(unittest.main)
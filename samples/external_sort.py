@@ -0,0 +1,152 @@
+import argparse
+import heapq
+import mmap
+import os
+import sys
+import tempfile
+
+from hybrid_sort import hybrid_sort
+
+# Runs merged at once; more runs than this are merged in several passes
+MAX_MERGE = 64
+BUFFER_SIZE = 1024 * 1024
+
+
+class SortStats:
+    def __init__(self):
+        self.spills = 0
+        self.merge_passes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def __str__(self):
+        return "%d runs spilled, %d merge passes, %d bytes read, %d bytes written" % (
+            self.spills, self.merge_passes, self.bytes_read, self.bytes_written)
+
+
+def parse_size(size_str):
+    """Parse a size such as 512K, 64M or 2G into a number of bytes."""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    size_str = size_str.strip().upper()
+    if size_str and size_str[-1] in units:
+        return int(float(size_str[:-1]) * units[size_str[-1]])
+    return int(size_str)
+
+
+def read_lines(filename, stats, use_mmap=False, buffer_size=BUFFER_SIZE):
+    # every line is returned with a trailing newline, so that lines can be
+    # written out in any order
+    with open(filename, 'rb', buffering=buffer_size) as f:
+        if use_mmap:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                lines = iter(m.readline, b'')
+                for line in lines:
+                    stats.bytes_read += len(line)
+                    yield line if line.endswith(b'\n') else line + b'\n'
+        else:
+            for line in f:
+                stats.bytes_read += len(line)
+                yield line if line.endswith(b'\n') else line + b'\n'
+
+
+def write_run(lines, temp_dir, stats, buffer_size=BUFFER_SIZE):
+    fd, filename = tempfile.mkstemp(prefix="run-", suffix=".txt", dir=temp_dir)
+    with open(fd, 'wb', buffering=buffer_size) as f:
+        for line in lines:
+            f.write(line)
+            stats.bytes_written += len(line)
+    return filename
+
+
+def sorted_runs(lines, memory, temp_dir, stats, key=None):
+    """Sort lines in batches which fit in the memory budget, spilling each
+       sorted batch to a temporary file, and return the file names and the
+       sorted lines which were not spilled. If every line fits in the first
+       batch, that batch is never spilled, since there is nothing to merge it
+       with; otherwise every batch is.
+       """
+    runs = []
+    batch = []
+    batch_size = 0
+
+    for line in lines:
+        batch.append(line)
+        # count the list slot as well as the bytes object
+        batch_size += sys.getsizeof(line) + 8
+        if batch_size >= memory:
+            runs.append(write_run(hybrid_sort(batch, key=key), temp_dir, stats))
+            stats.spills += 1
+            batch = []
+            batch_size = 0
+
+    if batch:
+        hybrid_sort(batch, key=key)
+        if not runs:
+            return runs, batch
+        runs.append(write_run(batch, temp_dir, stats))
+        stats.spills += 1
+
+    return runs, []
+
+
+def merge_runs(runs, stats, key=None, use_mmap=False):
+    return heapq.merge(*[read_lines(run, stats, use_mmap) for run in runs], key=key)
+
+
+def external_sort(input_file, output_file, memory=64 * 1024 ** 2, temp_dir=None, key=None,
+                  use_mmap=False, max_merge=MAX_MERGE):
+    """Sort the lines of input_file into output_file without holding more than
+       about memory bytes of lines at once, and return a SortStats. Sorted runs
+       are written to temporary files in temp_dir, and merged at most
+       max_merge at a time. key is applied to each line, as bytes.
+       """
+    if max_merge < 2:
+        raise ValueError("At least two runs must be merged at once.")
+
+    stats = SortStats()
+
+    with tempfile.TemporaryDirectory(prefix="external_sort-", dir=temp_dir) as run_dir:
+        runs, lines = sorted_runs(read_lines(input_file, stats), memory, run_dir, stats, key)
+
+        while len(runs) > max_merge:
+            stats.merge_passes += 1
+            merged = []
+            for i in range(0, len(runs), max_merge):
+                group = runs[i:i + max_merge]
+                merged.append(write_run(merge_runs(group, stats, key, use_mmap), run_dir, stats))
+                for run in group:
+                    os.remove(run)
+            runs = merged
+
+        if runs:
+            stats.merge_passes += 1
+            lines = merge_runs(runs, stats, key, use_mmap)
+
+        with open(output_file, 'wb', buffering=BUFFER_SIZE) as f:
+            for line in lines:
+                f.write(line)
+                stats.bytes_written += len(line)
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="the file to sort, one record per line")
+    parser.add_argument("output", help="the destination file")
+    parser.add_argument("-m", "--memory", help="the memory budget for sorting, e.g. 512K, 64M or 2G",
+                        type=parse_size, default="64M")
+    parser.add_argument("-t", "--temp-dir", help="the directory for the sorted runs")
+    parser.add_argument("--max-merge", help="the most runs merged at once", type=int, default=MAX_MERGE)
+    parser.add_argument("--mmap", help="read the sorted runs through memory maps", action="store_true")
+
+    opts = parser.parse_args()
+
+    try:
+        stats = external_sort(opts.input, opts.output, opts.memory, opts.temp_dir,
+                              use_mmap=opts.mmap, max_merge=opts.max_merge)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(stats, file=sys.stderr)
@@ -1,16 +1,24 @@
 import random
 from tkinter import Tk, Label, Button, Entry, StringVar, DISABLED, NORMAL, END, W, E
+# ourprog has to be installed, as in the packaging chapter, or be on the
+# path: PYTHONPATH=ourprog python guessing_gui.py
+from ourprog.gui import BackgroundTasks
+
+def pick_secret_number():
+    # this runs on a worker thread, so a slower source of numbers would not freeze the window
+    return random.SystemRandom().randint(1, 100)
 
 class GuessingGame:
     def __init__(self, master):
         self.master = master
         master.title("Guessing Game")
 
-        self.secret_number = random.randint(1, 100)
+        self.tasks = BackgroundTasks(master)
+        self.secret_number = None
         self.guess = None
         self.num_guesses = 0
 
-        self.message = "Guess a number from 1 to 100"
+        self.message = "Thinking of a number..."
         self.label_text = StringVar()
         self.label_text.set(self.message)
         self.label = Label(master, textvariable=self.label_text)
@@ -18,7 +26,7 @@ class GuessingGame:
         vcmd = master.register(self.validate) # we have to wrap the command
         self.entry = Entry(master, validate="key", validatecommand=(vcmd, '%P'))
 
-        self.guess_button = Button(master, text="Guess", command=self.guess_number)
+        self.guess_button = Button(master, text="Guess", command=self.guess_number, state=DISABLED)
         self.reset_button = Button(master, text="Play again", command=self.reset, state=DISABLED)
 
         self.label.grid(row=0, column=0, columnspan=2, sticky=W+E)
@@ -26,6 +34,14 @@ class GuessingGame:
         self.guess_button.grid(row=2, column=0)
         self.reset_button.grid(row=2, column=1)
 
+        self.tasks.submit(pick_secret_number, on_done=self.start)
+
+    def start(self, secret_number):
+        self.secret_number = secret_number
+        self.message = "Guess a number from 1 to 100"
+        self.label_text.set(self.message)
+        self.guess_button.configure(state=NORMAL)
+
     def validate(self, new_text):
         if not new_text: # the field is being cleared
             self.guess = None
@@ -62,16 +78,23 @@ class GuessingGame:
 
     def reset(self):
         self.entry.delete(0, END)
-        self.secret_number = random.randint(1, 100)
+        self.secret_number = None
         self.guess = 0
         self.num_guesses = 0
 
-        self.message = "Guess a number from 1 to 100"
+        self.message = "Thinking of a number..."
         self.label_text.set(self.message)
 
-        self.guess_button.configure(state=NORMAL)
         self.reset_button.configure(state=DISABLED)
+        self.tasks.submit(pick_secret_number, on_done=self.start)
+
+    def close(self):
+        self.tasks.shutdown()
+        self.master.destroy()
+
+if __name__ == "__main__":
+    root = Tk()
+    my_gui = GuessingGame(root)
+    root.protocol("WM_DELETE_WINDOW", my_gui.close)
+    root.mainloop()
 
-root = Tk()
-my_gui = GuessingGame(root)
-root.mainloop()
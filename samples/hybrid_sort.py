@@ -0,0 +1,176 @@
+from bisect import bisect_left, bisect_right
+
+# Runs shorter than this are extended with insertion sort before merging
+MIN_MERGE = 64
+# After this many consecutive wins by one run, a merge switches to galloping
+MIN_GALLOP = 7
+
+
+def min_run_length(n):
+    """Choose a run length between MIN_MERGE / 2 and MIN_MERGE so that n / run
+       length is close to a power of two, which keeps the merges balanced.
+       """
+    remainder = 0
+    while n >= MIN_MERGE:
+        remainder |= n & 1
+        n >>= 1
+    return n + remainder
+
+
+def count_run(items, start, end):
+    """Find the natural run starting at start, reversing it in place if it is
+       descending, and return the index where it ends. Descending runs must be
+       strictly descending, so that reversing them cannot reorder equal items.
+       """
+    run_end = start + 1
+    if run_end == end:
+        return end
+
+    if items[run_end] < items[start]:
+        while run_end < end and items[run_end] < items[run_end - 1]:
+            run_end += 1
+        items[start:run_end] = items[start:run_end][::-1]
+    else:
+        while run_end < end and not items[run_end] < items[run_end - 1]:
+            run_end += 1
+
+    return run_end
+
+
+def insertion_sort(items, start, end, sorted_end):
+    """Extend the sorted section items[start:sorted_end] to items[start:end]
+       with binary insertion.
+       """
+    for i in range(sorted_end, end):
+        item = items[i]
+        pos = bisect_right(items, item, start, i)
+        items[pos + 1:i + 1] = items[pos:i]
+        items[pos] = item
+
+
+def gallop_right(item, items, start, end):
+    # the position after the last element of items[start:end] which is <= item,
+    # found by probing at exponentially growing distances before bisecting
+    last, offset = 0, 1
+    while start + offset < end and not item < items[start + offset - 1]:
+        last, offset = offset, offset * 2 + 1
+    return bisect_right(items, item, start + last, min(start + offset, end))
+
+
+def gallop_left(item, items, start, end):
+    # the position of the first element of items[start:end] which is >= item
+    last, offset = 0, 1
+    while start + offset < end and items[start + offset - 1] < item:
+        last, offset = offset, offset * 2 + 1
+    return bisect_left(items, item, start + last, min(start + offset, end))
+
+
+def merge(items, start, middle, end):
+    """Merge the sorted sections items[start:middle] and items[middle:end]."""
+    # items at the start of the first run which are <= the second run's first
+    # item, and items at the end of the second run which are >= the first
+    # run's last item, are already in their final positions
+    start = bisect_right(items, items[middle], start, middle)
+    if start == middle:
+        return
+    end = bisect_left(items, items[middle - 1], middle, end)
+
+    temporary_storage = items[start:middle]
+    length_1 = middle - start
+    i_1, i_2, i_t = 0, middle, start
+    wins_1 = wins_2 = 0
+
+    while i_1 < length_1 and i_2 < end:
+        if items[i_2] < temporary_storage[i_1]:
+            items[i_t] = items[i_2]
+            i_2 += 1
+            wins_1, wins_2 = 0, wins_2 + 1
+        else:
+            items[i_t] = temporary_storage[i_1]
+            i_1 += 1
+            wins_1, wins_2 = wins_1 + 1, 0
+        i_t += 1
+
+        if wins_1 >= MIN_GALLOP and i_2 < end:
+            # copy every remaining item of the first run which is <= the next item of the second
+            count = gallop_right(items[i_2], temporary_storage, i_1, length_1) - i_1
+            items[i_t:i_t + count] = temporary_storage[i_1:i_1 + count]
+            i_1 += count
+            i_t += count
+            wins_1 = 0
+        elif wins_2 >= MIN_GALLOP and i_1 < length_1:
+            # copy every remaining item of the second run which is < the next item of the first
+            count = gallop_left(temporary_storage[i_1], items, i_2, end) - i_2
+            items[i_t:i_t + count] = items[i_2:i_2 + count]
+            i_2 += count
+            i_t += count
+            wins_2 = 0
+
+    # whatever is left of the second run is already in place
+    items[i_t:i_t + length_1 - i_1] = temporary_storage[i_1:length_1]
+
+
+def _sort(items):
+    n = len(items)
+    if n < 2:
+        return
+
+    min_run = min_run_length(n)
+    runs = []
+    start = 0
+
+    while start < n:
+        run_end = count_run(items, start, n)
+        if run_end - start < min_run:
+            end = min(start + min_run, n)
+            insertion_sort(items, start, end, run_end)
+            run_end = end
+        runs.append(start)
+        start = run_end
+    runs.append(n)
+
+    # merge neighbouring runs pairwise until only one is left
+    while len(runs) > 2:
+        merged = []
+        for i in range(0, len(runs) - 2, 2):
+            merge(items, runs[i], runs[i + 1], runs[i + 2])
+            merged.append(runs[i])
+        if len(runs) % 2 == 0:
+            merged.append(runs[-2])
+        merged.append(n)
+        runs = merged
+
+
+def hybrid_sort(items, key=None, reverse=False):
+    """Sort a list in place, stably, and return it. Natural runs in the input
+       are kept, short runs are extended with insertion sort, and runs are
+       merged with galloping. key and reverse work as they do for sorted().
+       """
+    if reverse:
+        # sorting the reversed list and reversing the result keeps equal items in order
+        items.reverse()
+
+    if key is None:
+        _sort(items)
+    else:
+        # the index breaks ties, so that the items themselves are never compared
+        decorated = list(zip(map(key, items), range(len(items))))
+        _sort(decorated)
+        items[:] = [items[i] for k, i in decorated]
+
+    if reverse:
+        items.reverse()
+
+    return items
+
+
+if __name__ == "__main__":
+    print(hybrid_sort([5, 4, 3, 2, 1]))
+    print(hybrid_sort([3, 2, 3, 1, 5]))
+    print(hybrid_sort([]))
+    print(hybrid_sort([1]))
+    print(hybrid_sort([2, 1]))
+    print(hybrid_sort([1, 2]))
+    print(hybrid_sort([3, 3]))
+    print(hybrid_sort(list(range(100, 0, -1))))
+    print(hybrid_sort(["b", "A", "c", "a"], key=str.lower, reverse=True))
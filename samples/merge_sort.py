@@ -1,3 +1,7 @@
+from profiling import profile
+
+
+@profile
 def merge(items, sections, temporary_storage):
     (start_1, end_1), (start_2, end_2) = sections
     i_1 = start_1
@@ -30,6 +34,7 @@ def merge(items, sections, temporary_storage):
         items[start_1 + i] = temporary_storage[i]
 
 
+@profile
 def merge_sort(items):
     n = len(items)
     temporary_storage = [None] * n
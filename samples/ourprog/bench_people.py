@@ -0,0 +1,39 @@
+import gc
+import tracemalloc
+
+from ourprog.rules import Person, PersonTable
+
+
+class DictPerson:
+    # the original, dict-backed representation of Person, for comparison
+    def __init__(self, name, surname):
+        self.name = name
+        self.surname = surname
+
+
+def people(n):
+    # the same strings are used for every representation, so only the
+    # containers are measured
+    return [("Name%d" % i, "Surname%d" % i) for i in range(n)]
+
+
+def bytes_per_person(build, rows):
+    gc.collect()
+    tracemalloc.start()
+    container = build(rows)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del container
+    return allocated / len(rows)
+
+
+REPRESENTATIONS = [
+    ("dict-backed objects", lambda rows: [DictPerson(name, surname) for name, surname in rows]),
+    ("slotted Person", lambda rows: [Person(name, surname) for name, surname in rows]),
+    ("PersonTable", PersonTable),
+]
+
+if __name__ == "__main__":
+    rows = people(100000)
+    for label, build in REPRESENTATIONS:
+        print("%-20s %6.1f bytes per person" % (label, bytes_per_person(build, rows)))
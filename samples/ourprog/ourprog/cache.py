@@ -0,0 +1,140 @@
+import collections
+import time
+
+from ourprog.db import PersonStore
+from ourprog.rules import Person
+
+# Stands in for "not in the cache", since None is a value which can be cached
+MISSING = object()
+
+
+class LRUCache:
+    """A dictionary-like cache which holds at most maxsize entries, and throws
+       away the least recently used entry to make room for a new one. If ttl
+       is given, entries also expire that many seconds after they were added.
+       """
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = collections.OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return the value for key, or MISSING if it is not cached."""
+        entry = self.entries.get(key, MISSING)
+        if entry is MISSING:
+            self.misses += 1
+            return MISSING
+
+        value, expires = entry
+        if expires is not None and expires <= self.clock():
+            del self.entries[key]
+            self.misses += 1
+            return MISSING
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        self.entries[key] = value, expires
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.entries)}
+
+
+class CachedPersonStore:
+    """Wraps a PersonStore with a read-through LRUCache for get and find.
+       Misses are cached too, so looking up someone who does not exist does
+       not go to the database every time. Every write through this object
+       invalidates the entries it could have changed; writes made to the
+       database some other way are only seen once the entries expire.
+
+       find returns a list instead of a stream, since its results are cached.
+       """
+
+    def __init__(self, store=None, maxsize=1024, ttl=None, clock=time.monotonic):
+        self.store = store if store is not None else PersonStore()
+        self.cache = LRUCache(maxsize, ttl, clock)
+
+    def __len__(self):
+        return len(self.store)
+
+    def get(self, person_id):
+        key = ('id', person_id)
+        row = self.cache.get(key)
+        if row is MISSING:
+            person = self.store.get(person_id)
+            row = None if person is None else (person.name, person.surname)
+            self.cache.put(key, row)
+        # cache plain tuples, and build new objects, so that callers cannot change the cached values
+        return None if row is None else Person(*row)
+
+    def find(self, name=None, surname=None):
+        key = ('find', name, surname)
+        rows = self.cache.get(key)
+        if rows is MISSING:
+            rows = tuple((person_id, person.name, person.surname)
+                         for person_id, person in self.store.find(name, surname))
+            self.cache.put(key, rows)
+        return [(person_id, Person(name, surname)) for person_id, name, surname in rows]
+
+    def add(self, person):
+        person_id = self.store.add(person)
+        self._invalidate(person_id, person)
+        return person_id
+
+    def add_many(self, people):
+        count = self.store.add_many(people)
+        # the new ids are not known, and any of them may have been cached as a miss
+        self.cache.clear()
+        return count
+
+    def update(self, person_id, person):
+        old_person = self.store.get(person_id)
+        updated = self.store.update(person_id, person)
+        if old_person is not None:
+            self._invalidate(person_id, old_person)
+        self._invalidate(person_id, person)
+        return updated
+
+    def delete(self, person_id):
+        old_person = self.store.get(person_id)
+        deleted = self.store.delete(person_id)
+        if old_person is not None:
+            self._invalidate(person_id, old_person)
+        else:
+            self.cache.invalidate(('id', person_id))
+        return deleted
+
+    def _invalidate(self, person_id, person):
+        # every cached lookup which could include this person
+        self.cache.invalidate(('id', person_id))
+        for name in (person.name, None):
+            for surname in (person.surname, None):
+                self.cache.invalidate(('find', name, surname))
+
+    def stats(self):
+        return self.cache.stats()
+
+    def close(self):
+        self.store.close()
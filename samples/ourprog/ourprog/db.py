@@ -0,0 +1,105 @@
+import sqlite3
+
+from ourprog.rules import Person
+
+# Rows fetched from the database at a time when iterating over results
+FETCH_SIZE = 1000
+
+# The SQL is kept in constants, so that every call uses the same statement
+# text and sqlite3 can reuse the prepared statement from its cache
+CREATE_TABLE = "CREATE TABLE IF NOT EXISTS person (id INTEGER PRIMARY KEY, name TEXT NOT NULL, surname TEXT NOT NULL)"
+CREATE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS person_surname ON person (surname, name)",
+    "CREATE INDEX IF NOT EXISTS person_name ON person (name)",
+]
+INSERT = "INSERT INTO person (name, surname) VALUES (?, ?)"
+SELECT_BY_ID = "SELECT name, surname FROM person WHERE id = ?"
+SELECT_ALL = "SELECT id, name, surname FROM person ORDER BY id"
+SELECT_BY_SURNAME = "SELECT id, name, surname FROM person WHERE surname = ? ORDER BY id"
+SELECT_BY_NAME = "SELECT id, name, surname FROM person WHERE name = ? ORDER BY id"
+SELECT_BY_FULL_NAME = "SELECT id, name, surname FROM person WHERE surname = ? AND name = ? ORDER BY id"
+UPDATE = "UPDATE person SET name = ?, surname = ? WHERE id = ?"
+DELETE = "DELETE FROM person WHERE id = ?"
+COUNT = "SELECT COUNT(*) FROM person"
+
+
+class PersonStore:
+    """Stores Person objects in an SQLite database, which is kept in memory
+       unless a file name is given. People are identified by the integer id
+       which they are given when they are added.
+       """
+
+    def __init__(self, filename=":memory:", cached_statements=128):
+        self.connection = sqlite3.connect(filename, cached_statements=cached_statements)
+        with self.connection:
+            self.connection.execute(CREATE_TABLE)
+            for statement in CREATE_INDEXES:
+                self.connection.execute(statement)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute(COUNT).fetchone()[0]
+
+    def __iter__(self):
+        return self._people(SELECT_ALL, ())
+
+    def add(self, person):
+        """Add one person, and return their id."""
+        with self.connection:
+            return self.connection.execute(INSERT, (person.name, person.surname)).lastrowid
+
+    def add_many(self, people):
+        """Add many people in a single transaction, and return how many were
+           added. If any of them cannot be added, none of them are.
+           """
+        with self.connection:
+            cursor = self.connection.executemany(INSERT, ((person.name, person.surname) for person in people))
+        return cursor.rowcount
+
+    def get(self, person_id):
+        """Return the person with the given id, or None."""
+        row = self.connection.execute(SELECT_BY_ID, (person_id,)).fetchone()
+        return None if row is None else Person(*row)
+
+    def find(self, name=None, surname=None):
+        """Yield (id, person) pairs for everyone with the given name and / or
+           surname, in the order they were added. Results are fetched from
+           the database a few at a time, so any number of them can be read.
+           """
+        if name is not None and surname is not None:
+            return self._people(SELECT_BY_FULL_NAME, (surname, name))
+        if surname is not None:
+            return self._people(SELECT_BY_SURNAME, (surname,))
+        if name is not None:
+            return self._people(SELECT_BY_NAME, (name,))
+        return iter(self)
+
+    def update(self, person_id, person):
+        """Replace the person with the given id, and return whether they existed."""
+        with self.connection:
+            return self.connection.execute(UPDATE, (person.name, person.surname, person_id)).rowcount > 0
+
+    def delete(self, person_id):
+        """Remove the person with the given id, and return whether they existed."""
+        with self.connection:
+            return self.connection.execute(DELETE, (person_id,)).rowcount > 0
+
+    def _people(self, statement, parameters):
+        cursor = self.connection.execute(statement, parameters)
+        try:
+            while True:
+                rows = cursor.fetchmany(FETCH_SIZE)
+                if not rows:
+                    break
+                for person_id, name, surname in rows:
+                    yield person_id, Person(name, surname)
+        finally:
+            cursor.close()
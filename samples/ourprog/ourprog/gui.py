@@ -0,0 +1,74 @@
+import concurrent.futures
+import queue
+
+# How often, in milliseconds, the GUI thread checks for finished work
+POLL_INTERVAL = 20
+
+
+class BackgroundTasks:
+    """Runs slow functions on a pool of worker threads, so that the window
+       stays responsive while they run, and passes their results back to
+       callbacks on the GUI thread. Tk may only be used from the thread
+       which runs its main loop, so the workers never touch it: finished
+       work is put on a queue, which the GUI thread checks with root.after
+       while any work is pending.
+
+       Any object with Tk's after and after_cancel methods can be used as
+       the root.
+       """
+
+    def __init__(self, root, workers=1, poll_interval=POLL_INTERVAL):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers)
+        self.finished = queue.SimpleQueue()
+        self.pending = 0
+        self.poll_id = None
+
+    def submit(self, function, *args, on_done=None, on_error=None):
+        """Call function(*args) on a worker thread. When it returns, on_done
+           is called with its result on the GUI thread; if it raises an
+           exception, on_error is called with the exception instead.
+           """
+        future = self.executor.submit(function, *args)
+        future.add_done_callback(lambda future: self.finished.put((future, on_done, on_error)))
+
+        self.pending += 1
+        if self.poll_id is None:
+            self.poll_id = self.root.after(self.poll_interval, self._poll)
+        return future
+
+    def busy(self):
+        return self.pending > 0
+
+    def shutdown(self):
+        """Stop checking for results and cancel any work which has not started."""
+        if self.poll_id is not None:
+            self.root.after_cancel(self.poll_id)
+            self.poll_id = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        self.poll_id = None
+        try:
+            while True:
+                try:
+                    future, on_done, on_error = self.finished.get_nowait()
+                except queue.Empty:
+                    break
+
+                self.pending -= 1
+                if future.cancelled():
+                    continue
+                error = future.exception()
+                if error is None:
+                    if on_done is not None:
+                        on_done(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    raise error
+        finally:
+            # stop polling when there is nothing left to wait for, so that an idle window uses no CPU
+            if self.pending and self.poll_id is None:
+                self.poll_id = self.root.after(self.poll_interval, self._poll)
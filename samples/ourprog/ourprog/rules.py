@@ -1,5 +1,7 @@
 class Person:
-    TITLES = ('Dr', 'Mr', 'Mrs', 'Ms')
+    TITLES = frozenset(('Dr', 'Mr', 'Mrs', 'Ms'))
+
+    __slots__ = ('name', 'surname')
 
     def __init__(self, name, surname):
         self.name = name
@@ -10,3 +12,39 @@ class Person:
             raise ValueError("Unrecognised title: '%s'" % title)
 
         return "%s %s %s" % (title, self.name, self.surname)
+
+
+class PersonTable:
+    """Many people stored as two columns, names and surnames, rather than as
+       one object each.
+       """
+
+    def __init__(self, people=()):
+        self.names = []
+        self.surnames = []
+        for name, surname in people:
+            self.append(name, surname)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        return Person(self.names[i], self.surnames[i])
+
+    def append(self, name, surname):
+        self.names.append(name)
+        self.surnames.append(surname)
+
+    def fullnames(self, titles):
+        """Return the full names of everyone in the table, given a column of
+           titles with one title for each person. All the titles are checked
+           before any names are built.
+           """
+        if len(titles) != len(self):
+            raise ValueError("Expected %d titles, got %d" % (len(self), len(titles)))
+
+        unrecognised = set(titles) - Person.TITLES
+        if unrecognised:
+            raise ValueError("Unrecognised title: '%s'" % min(unrecognised))
+
+        return list(map(" ".join, zip(titles, self.names, self.surnames)))
@@ -0,0 +1,138 @@
+import os
+import random
+import time
+import unittest
+from ourprog.cache import LRUCache, CachedPersonStore, MISSING
+from ourprog.db import PersonStore
+from ourprog.rules import Person
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1) # now "b" is the least recently used
+        cache.put("c", 3)
+
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats(), {"hits": 3, "misses": 1, "evictions": 1, "size": 2})
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = LRUCache(ttl=10, clock=clock)
+        cache.put("a", None)
+        clock.now = 9.9
+        self.assertIsNone(cache.get("a"))
+        clock.now = 10
+        self.assertIs(cache.get("a"), MISSING)
+        self.assertEqual(len(cache), 0)
+
+class TestCachedPersonStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = CachedPersonStore(maxsize=100)
+        self.jane = self.store.add(Person("Jane", "Smith"))
+        self.john = self.store.add(Person("John", "Smith"))
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_read_through(self):
+        self.assertEqual(self.store.get(self.jane).name, "Jane")
+        self.assertEqual(self.store.get(self.jane).name, "Jane")
+        self.assertEqual(self.store.stats()["hits"], 1)
+        self.assertEqual(self.store.stats()["misses"], 1)
+
+    def test_negative_results(self):
+        self.assertIsNone(self.store.get(1000))
+        self.assertIsNone(self.store.get(1000))
+        self.assertEqual(self.store.find(surname="Jones"), [])
+        self.assertEqual(self.store.find(surname="Jones"), [])
+        self.assertEqual(self.store.stats()["hits"], 2)
+
+    def test_update(self):
+        self.assertEqual(len(self.store.find(surname="Smith")), 2)
+        self.assertEqual(self.store.find(surname="Jones"), [])
+        self.store.get(self.jane)
+
+        self.store.update(self.jane, Person("Jane", "Jones"))
+
+        self.assertEqual(self.store.get(self.jane).surname, "Jones")
+        self.assertEqual([person_id for person_id, person in self.store.find(surname="Smith")], [self.john])
+        self.assertEqual([person_id for person_id, person in self.store.find(surname="Jones")], [self.jane])
+        self.assertEqual(len(self.store.find(name="Jane")), 1)
+
+    def test_delete(self):
+        self.assertEqual(len(self.store.find()), 2)
+        self.store.get(self.john)
+
+        self.store.delete(self.john)
+
+        self.assertIsNone(self.store.get(self.john))
+        self.assertEqual(len(self.store.find()), 1)
+        self.assertEqual(self.store.find("John", "Smith"), [])
+
+    def test_add_after_miss(self):
+        # the next id has been cached as missing before anyone has it
+        self.assertIsNone(self.store.get(self.john + 1))
+        self.assertEqual(self.store.find(surname="Doe"), [])
+
+        new_id = self.store.add(Person("Jim", "Doe"))
+        self.assertEqual(new_id, self.john + 1)
+        self.assertEqual(self.store.get(new_id).name, "Jim")
+        self.assertEqual(len(self.store.find(surname="Doe")), 1)
+
+        self.assertIsNone(self.store.get(new_id + 1))
+        self.store.add_many([Person("Ann", "Doe")])
+        self.assertEqual(self.store.get(new_id + 1).name, "Ann")
+        self.assertEqual(len(self.store.find(surname="Doe")), 2)
+
+    def test_cached_values_cannot_be_changed(self):
+        self.store.get(self.jane).name = "Changed"
+        self.store.find(surname="Smith")[0][1].name = "Changed"
+        self.assertEqual(self.store.get(self.jane).name, "Jane")
+        self.assertEqual(self.store.find(surname="Smith")[0][1].name, "Jane")
+
+
+@unittest.skipUnless(os.environ.get("OURPROG_BENCHMARK"), "set OURPROG_BENCHMARK=1 to run the benchmarks")
+class BenchmarkCachedPersonStore(unittest.TestCase):
+
+    N = 100000
+    LOOKUPS = 100000
+
+    def zipf_ids(self, s=1.1):
+        # a few people are looked up very often, and most of them rarely
+        rng = random.Random(0)
+        weights = [1.0 / rank ** s for rank in range(1, self.N + 1)]
+        return rng.choices(range(1, self.N + 1), weights=weights, k=self.LOOKUPS)
+
+    def time_lookups(self, store, ids):
+        begin = time.perf_counter()
+        for person_id in ids:
+            store.get(person_id)
+        return (time.perf_counter() - begin) / len(ids)
+
+    def test_zipf_latency(self):
+        ids = self.zipf_ids()
+        store = PersonStore()
+        store.add_many(Person("Name%d" % i, "Surname%d" % i) for i in range(self.N))
+
+        print()
+        print("uncached: %.2f us per lookup" % (self.time_lookups(store, ids) * 1e6))
+        for maxsize in (1000, 10000):
+            cached = CachedPersonStore(store, maxsize=maxsize)
+            latency = self.time_lookups(cached, ids)
+            stats = cached.stats()
+            print("cache of %d: %.2f us per lookup, hit rate %.1f%%, %d evictions"
+                  % (maxsize, latency * 1e6, 100.0 * stats["hits"] / self.LOOKUPS, stats["evictions"]))
+        store.close()
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import time
+import unittest
+from ourprog.db import PersonStore
+from ourprog.rules import Person
+
+class TestPersonStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = PersonStore()
+        self.jane = self.store.add(Person("Jane", "Smith"))
+        self.john = self.store.add(Person("John", "Smith"))
+        self.store.add_many([Person("Jane", "Doe"), Person("Mary", "Jones")])
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_add(self):
+        self.assertEqual(len(self.store), 4)
+        self.assertEqual(self.store.get(self.jane).fullname("Ms"), "Ms Jane Smith")
+        self.assertIsNone(self.store.get(1000))
+
+    def test_add_many_is_atomic(self):
+        people = [Person("Anne", "Brown"), Person(None, "Nobody")]
+        self.assertRaises(sqlite3.IntegrityError, self.store.add_many, people)
+        self.assertEqual(len(self.store), 4)
+
+    def test_find(self):
+        smiths = [(person_id, person.name) for person_id, person in self.store.find(surname="Smith")]
+        self.assertEqual(smiths, [(self.jane, "Jane"), (self.john, "John")])
+
+        janes = [person.surname for person_id, person in self.store.find(name="Jane")]
+        self.assertEqual(janes, ["Smith", "Doe"])
+
+        self.assertEqual([person_id for person_id, person in self.store.find("John", "Smith")], [self.john])
+        self.assertEqual(list(self.store.find(surname="Nobody")), [])
+        self.assertEqual(len(list(self.store.find())), 4)
+
+    def test_update_and_delete(self):
+        self.assertTrue(self.store.update(self.jane, Person("Jane", "Jones")))
+        self.assertEqual(self.store.get(self.jane).surname, "Jones")
+        self.assertFalse(self.store.update(1000, Person("Jane", "Jones")))
+
+        self.assertTrue(self.store.delete(self.john))
+        self.assertIsNone(self.store.get(self.john))
+        self.assertFalse(self.store.delete(self.john))
+        self.assertEqual(len(self.store), 3)
+
+    def test_iterate_in_batches(self):
+        self.store.add_many(Person("Name%d" % i, "Surname%d" % (i % 10)) for i in range(2500))
+        people = list(self.store)
+        self.assertEqual(len(people), 2504)
+        self.assertEqual(people[-1][1].name, "Name2499")
+
+
+@unittest.skipUnless(os.environ.get("OURPROG_BENCHMARK"), "set OURPROG_BENCHMARK=1 to run the benchmarks")
+class BenchmarkPersonStore(unittest.TestCase):
+
+    N = 100000
+
+    def test_throughput(self):
+        people = [Person("Name%d" % i, "Surname%d" % (i % 1000)) for i in range(self.N)]
+
+        with PersonStore() as store:
+            begin = time.perf_counter()
+            store.add_many(people)
+            inserted = time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            for i in range(1000):
+                list(store.find(surname="Surname%d" % i))
+            by_surname = time.perf_counter() - begin
+
+            begin = time.perf_counter()
+            for i in range(1, self.N, 10):
+                store.get(i)
+            by_id = time.perf_counter() - begin
+
+        print()
+        print("bulk insert: %.0f people per second" % (self.N / inserted))
+        print("find by surname: %.0f lookups per second" % (1000 / by_surname))
+        print("get by id: %.0f lookups per second" % (self.N / 10 / by_id))
@@ -0,0 +1,162 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+import unittest
+from ourprog.gui import BackgroundTasks
+
+class EventLoop:
+    """Stands in for a Tk root, so that the tests can run without a display:
+       after callbacks are run in the order they are due, on the thread
+       which calls run_until.
+       """
+
+    def __init__(self):
+        self.timers = []
+        self.ids = itertools.count()
+        self.cancelled = set()
+
+    def after(self, ms, callback):
+        timer_id = next(self.ids)
+        heapq.heappush(self.timers, (time.monotonic() + ms / 1000.0, timer_id, callback))
+        return timer_id
+
+    def after_cancel(self, timer_id):
+        self.cancelled.add(timer_id)
+
+    def waiting(self):
+        return [timer_id for due, timer_id, callback in self.timers if timer_id not in self.cancelled]
+
+    def run_until(self, condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                raise AssertionError("timed out")
+            due, timer_id, callback = heapq.heappop(self.timers)
+            time.sleep(max(0, due - time.monotonic()))
+            if timer_id not in self.cancelled:
+                callback()
+
+class Ticker:
+    """Records how late each of a series of regular callbacks was."""
+
+    def __init__(self, loop, interval=5):
+        self.loop = loop
+        self.interval = interval
+        self.delays = []
+        self.running = True
+        self.schedule()
+
+    def schedule(self):
+        self.due = time.monotonic() + self.interval / 1000.0
+        self.loop.after(self.interval, self.tick)
+
+    def tick(self):
+        self.delays.append(time.monotonic() - self.due)
+        if self.running:
+            self.schedule()
+
+def busy(seconds):
+    # pure Python work, which holds the GIL in the same way as a slow calculation
+    end = time.monotonic() + seconds
+    count = 0
+    while time.monotonic() < end:
+        count += 1
+    return count
+
+class TestBackgroundTasks(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = EventLoop()
+        self.tasks = BackgroundTasks(self.loop, workers=2, poll_interval=5)
+        self.results = []
+
+    def tearDown(self):
+        self.tasks.shutdown()
+
+    def test_results_arrive_on_gui_thread(self):
+        self.tasks.submit(threading.get_ident, on_done=self.results.append)
+        self.tasks.submit(lambda: threading.get_ident(), on_done=lambda worker: self.results.append(threading.get_ident()))
+        self.loop.run_until(lambda: len(self.results) == 2)
+
+        self.assertNotEqual(self.results[0], threading.get_ident())
+        self.assertEqual(self.results[1], threading.get_ident())
+        # nothing is left polling once the work is done
+        self.assertEqual(self.loop.waiting(), [])
+        self.assertFalse(self.tasks.busy())
+
+    def test_errors(self):
+        self.tasks.submit(int, "x", on_done=self.results.append, on_error=self.results.append)
+        self.loop.run_until(lambda: self.results)
+        self.assertIsInstance(self.results[0], ValueError)
+
+    def test_shutdown(self):
+        self.tasks.submit(time.sleep, 0.05)
+        self.tasks.shutdown()
+        self.assertEqual(self.loop.waiting(), [])
+
+    def test_event_loop_keeps_running(self):
+        # while slow work runs in the background, the event loop should keep
+        # running its callbacks, on its own thread
+        ticks = []
+        ticker = Ticker(self.loop)
+        ticker.tick = lambda: (ticks.append((threading.get_ident(), len(self.results))), ticker.schedule())
+        self.tasks.submit(busy, 0.2, on_done=self.results.append)
+        self.loop.run_until(lambda: self.results)
+
+        self.assertTrue(ticks)
+        self.assertEqual({thread for thread, finished in ticks}, {threading.get_ident()})
+        # some of the callbacks ran before the work was finished
+        self.assertEqual(ticks[0][1], 0)
+
+
+@unittest.skipUnless(os.environ.get("OURPROG_BENCHMARK"), "set OURPROG_BENCHMARK=1 to run the benchmarks")
+class BenchmarkBackgroundTasks(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = EventLoop()
+        self.tasks = BackgroundTasks(self.loop, workers=2, poll_interval=5)
+        self.results = []
+
+    def tearDown(self):
+        self.tasks.shutdown()
+
+    def test_event_loop_latency(self):
+        # callbacks should stay on time, give or take a few thread switches,
+        # on a machine which is not busy with anything else
+        ticker = Ticker(self.loop)
+        self.tasks.submit(busy, 0.5, on_done=self.results.append)
+        self.tasks.submit(time.sleep, 0.5, on_done=self.results.append)
+        self.loop.run_until(lambda: len(self.results) == 2)
+        ticker.running = False
+
+        self.assertGreater(len(ticker.delays), 20)
+        self.assertLess(max(ticker.delays), 0.1)
+
+        # run on the event loop itself, the same work would delay the next callback by all of it
+        ticker = Ticker(self.loop)
+        self.loop.after(0, lambda: self.results.append(busy(0.2)))
+        self.loop.run_until(lambda: len(ticker.delays) == 2)
+        ticker.running = False
+        self.assertGreater(max(ticker.delays), 0.1)
+
+class TestBackgroundTasksWithTk(unittest.TestCase):
+
+    def test_tk(self):
+        try:
+            from tkinter import Tk, TclError
+            root = Tk()
+        except (ImportError, TclError) as e: # no display
+            self.skipTest(str(e))
+
+        results = []
+        tasks = BackgroundTasks(root)
+        tasks.submit(sum, range(10), on_done=results.append)
+        deadline = time.monotonic() + 10
+        while not results and time.monotonic() < deadline:
+            root.update()
+            time.sleep(0.001)
+        tasks.shutdown()
+        root.destroy()
+        self.assertEqual(results, [45])
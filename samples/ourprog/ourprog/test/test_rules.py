@@ -1,5 +1,5 @@
 import unittest
-from ourprog.rules import Person
+from ourprog.rules import Person, PersonTable
 
 class TestPerson(unittest.TestCase):
 
@@ -14,3 +14,23 @@ class TestPerson(unittest.TestCase):
         self.assertEqual(self.person.fullname("Ms"), "Ms Jane Smith")
         self.assertEqual(self.person.fullname("Mrs"), "Mrs Jane Smith")
         self.assertRaises(ValueError, self.person.fullname, "HRH")
+
+    def test_slots(self):
+        self.assertRaises(AttributeError, setattr, self.person, "age", 30)
+
+
+class TestPersonTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = PersonTable([("Jane", "Smith"), ("John", "Doe")])
+
+    def test_init(self):
+        self.assertEqual(len(self.table), 2)
+        self.assertEqual(self.table.names, ["Jane", "John"])
+        self.assertEqual(self.table.surnames, ["Smith", "Doe"])
+        self.assertEqual(self.table[1].fullname("Mr"), "Mr John Doe")
+
+    def test_fullnames(self):
+        self.assertEqual(self.table.fullnames(["Ms", "Dr"]), ["Ms Jane Smith", "Dr John Doe"])
+        self.assertRaises(ValueError, self.table.fullnames, ["Ms", "HRH"])
+        self.assertRaises(ValueError, self.table.fullnames, ["Ms"])
@@ -0,0 +1,126 @@
+import array
+import multiprocessing
+import os
+import random
+import time
+
+from merge_sort import merge, merge_sort
+
+# The shared buffers, set in each worker process when the pool starts. Tasks
+# only carry indices into them, so the items themselves are never pickled.
+_buffers = None
+
+
+def _init_worker(buffers):
+    global _buffers
+    _buffers = buffers
+
+
+def _sort_chunk(start, end):
+    buffer = _buffers[0]
+    buffer[start:end] = merge_sort(buffer[start:end])
+
+
+def _merge_chunks(source, start, middle, end):
+    items = _buffers[source][start:end]
+    sections = (0, middle - start), (middle - start, end - start)
+    merge(items, sections, [None] * (end - start))
+    _buffers[1 - source][start:end] = items
+
+
+def _copy_chunk(source, start, end):
+    _buffers[1 - source][start:end] = _buffers[source][start:end]
+
+
+def _default_typecode(items):
+    if isinstance(items, array.array):
+        return items.typecode
+    types = set(map(type, items))
+    if types == {int}:
+        return 'q'
+    if types == {float}:
+        return 'd'
+    return None # mixed types, bools and so on, which a typed buffer would change
+
+
+def _round_trips(items, typecode):
+    # whether every item comes back out of a typed buffer as it went in
+    try:
+        converted = array.array(typecode, items)
+    except (OverflowError, TypeError):
+        return False
+    return all(type(a) is type(b) and (a == b or a != a) for a, b in zip(converted, items))
+
+
+def parallel_merge_sort(items, workers=None, typecode=None):
+    """Sort a list or array of numbers in place with a pool of worker
+       processes, and return it. The items are copied once into a shared
+       typed buffer; each worker sorts one chunk of it with merge_sort, and
+       then the sorted chunks are merged pairwise, also in parallel, until
+       only one is left. typecode is an array module type code for the
+       buffer -- by default it is taken from an array, or is 'q' for a list
+       of ints and 'd' for a list of floats. Items which would not come back
+       unchanged from the buffer, like ints too big for 'q', a mix of ints
+       and floats or bools, raise ValueError if typecode is given, and are
+       otherwise sorted by merge_sort in this process.
+       """
+    workers = workers or os.cpu_count() or 1
+    n = len(items)
+
+    if typecode is not None and not _round_trips(items, typecode):
+        raise ValueError("The items can't be stored in a buffer of type %r without changing them." % typecode)
+
+    if workers == 1 or n < workers * 2:
+        return merge_sort(items)
+
+    if typecode is None:
+        typecode = _default_typecode(items)
+        if typecode is None or not _round_trips(items, typecode):
+            return merge_sort(items)
+
+    buffers = multiprocessing.RawArray(typecode, n), multiprocessing.RawArray(typecode, n)
+    buffers[0][:] = items
+
+    bounds = [n * i // workers for i in range(workers + 1)]
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(buffers,)) as pool:
+        pool.starmap(_sort_chunk, zip(bounds, bounds[1:]))
+
+        # merge neighbouring chunks pairwise, switching between the two buffers on each round
+        source = 0
+        while len(bounds) > 2:
+            tasks = [(source, bounds[i], bounds[i + 1], bounds[i + 2]) for i in range(0, len(bounds) - 2, 2)]
+            merged = bounds[0:-2:2]
+            if len(bounds) % 2 == 0:
+                # an odd number of chunks: the last one has no partner this round
+                pool.apply(_copy_chunk, (source, bounds[-2], bounds[-1]))
+                merged.append(bounds[-2])
+            merged.append(n)
+
+            pool.starmap(_merge_chunks, tasks)
+            bounds = merged
+            source = 1 - source
+
+    if isinstance(items, array.array):
+        items[:] = array.array(typecode, buffers[source])
+    else:
+        items[:] = buffers[source][:]
+    return items
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    n = 1000000
+    numbers = [rng.random() for i in range(n)]
+
+    begin = time.perf_counter()
+    expected = merge_sort(list(numbers))
+    serial = time.perf_counter() - begin
+    print("serial merge_sort: %.2fs" % serial)
+
+    for workers in (2, 4, 8):
+        begin = time.perf_counter()
+        result = parallel_merge_sort(list(numbers), workers=workers)
+        elapsed = time.perf_counter() - begin
+        assert result == expected
+        print("%d workers: %.2fs, speedup %.2fx" % (workers, elapsed, serial / elapsed))
@@ -0,0 +1,216 @@
+"""A profiling decorator, which grows the log decorator from the Functions
+   chapter into something which measures instead of logging. Decorated
+   functions record how often they are called, their total time (including
+   the decorated functions which they call) and self time (excluding them),
+   and a histogram of how long each call took.
+
+   Profiling is off until enable is called, and while it is off most
+   decorated functions cost nothing extra at all. It can also be switched on
+   for a whole program by setting the SAMPLES_PROFILE environment variable
+   to a sample rate, which prints a report when the program exits:
+
+       SAMPLES_PROFILE=1 python merge_sort.py
+   """
+import functools
+import os
+import time
+
+# Latencies are counted in buckets by the number of bits in the time in
+# nanoseconds, so bucket b holds the calls which took less than 2 ** b ns
+HISTOGRAM_BUCKETS = 64
+
+
+class FunctionStats:
+    """The measurements for one decorated function. Times are in
+       nanoseconds, and only include the calls which were timed.
+       """
+    __slots__ = ("name", "calls", "timed_calls", "total_ns", "self_ns", "active", "histogram")
+
+    def __init__(self, name):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.timed_calls = 0
+        self.total_ns = 0
+        self.self_ns = 0
+        self.active = 0 # calls in progress, so that recursive calls are not added to the total twice
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "timed_calls": self.timed_calls,
+            "total_ns": self.total_ns,
+            "self_ns": self.self_ns,
+            # keyed by the upper bound of each bucket, leaving out the empty ones
+            "histogram": {str(2 ** bucket): count for bucket, count in enumerate(self.histogram) if count},
+        }
+
+
+class Profiler:
+    """Collects FunctionStats for the functions decorated with its profile
+       method. With a sample rate below 1, only some calls are timed -- the
+       rest are only counted -- which makes profiling cheaper. Calls are
+       sampled a whole call tree at a time, so that the self times of the
+       functions in a timed call are always correct.
+       """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_every = 1
+        self.stats = {}
+        self.swappable = []
+        self.root_calls = 0
+        self.local = None
+
+    def profile(self, function=None, name=None):
+        """Decorate a function, as @profile or @profile(name="...").
+
+           While profiling is off, a module-level function is left exactly
+           as it was, so that it costs nothing: enable replaces it in its
+           module with the profiled version, and disable puts it back.
+           Calls made through the module, including recursive calls, follow
+           the switch, but a copy taken with from ... import before
+           profiling is enabled stays unprofiled. Methods and nested
+           functions cannot be swapped, so they always go through the
+           profiled version, which checks whether profiling is on.
+           """
+        if function is None:
+            return functools.partial(self.profile, name=name)
+
+        name = name or "%s.%s" % (function.__module__, function.__qualname__)
+        stats = self.stats.setdefault(name, FunctionStats(name))
+
+        @functools.wraps(function)
+        def profiled_function(*args, **kwargs):
+            if not self.enabled:
+                return function(*args, **kwargs)
+            stats.calls += 1
+            local = self.local
+            if local.skipping: # inside a call tree which is not being timed
+                return function(*args, **kwargs)
+            return self.call(local, stats, function, args, kwargs)
+
+        if function.__qualname__ != function.__name__:
+            return profiled_function
+
+        self.swappable.append((function.__globals__, function.__name__, function, profiled_function))
+        return profiled_function if self.enabled else function
+
+    def enable(self, sample_rate=1.0):
+        """Start profiling, timing about sample_rate of the calls."""
+        if not 0 < sample_rate <= 1:
+            raise ValueError("The sample rate must be more than 0 and at most 1.")
+        if self.local is None:
+            import threading # only needed once profiling is used
+
+            class CallState(threading.local):
+                # set up separately on each thread
+                def __init__(self):
+                    self.frames = []
+                    self.skipping = 0
+
+            self.local = CallState()
+        self.sample_every = round(1 / sample_rate)
+        self.enabled = True
+        self._swap(original=False)
+
+    def disable(self):
+        self.enabled = False
+        self._swap(original=True)
+
+    def _swap(self, original):
+        for namespace, name, function, profiled_function in self.swappable:
+            old, new = (profiled_function, function) if original else (function, profiled_function)
+            # leave the name alone if something else has been put there
+            if namespace.get(name) is old:
+                namespace[name] = new
+
+    def reset(self):
+        self.root_calls = 0
+        for stats in self.stats.values():
+            stats.reset()
+
+    def call(self, local, stats, function, args, kwargs):
+        frames = local.frames
+        if not frames:
+            self.root_calls += 1
+            if self.root_calls % self.sample_every:
+                local.skipping = 1
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    local.skipping = 0
+
+        # the time spent in decorated functions called from this one
+        children = [0]
+        frames.append(children)
+        stats.active += 1
+        start = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            frames.pop()
+            stats.active -= 1
+
+            stats.timed_calls += 1
+            stats.self_ns += elapsed - children[0]
+            if not stats.active:
+                stats.total_ns += elapsed
+            stats.histogram[min(elapsed.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+            if frames:
+                frames[-1][0] += elapsed
+
+    def results(self):
+        """Return the stats of every function which has been called, with the highest self time first."""
+        called = [stats for stats in self.stats.values() if stats.calls]
+        return sorted(called, key=lambda stats: stats.self_ns, reverse=True)
+
+    def report(self, histograms=False):
+        """Return a text report of the results."""
+        lines = ["%-40s %10s %10s %12s %12s %10s" % ("function", "calls", "timed", "total ms", "self ms", "mean us")]
+        for stats in self.results():
+            mean_us = stats.total_ns / stats.timed_calls / 1000.0 if stats.timed_calls else 0.0
+            lines.append("%-40s %10d %10d %12.3f %12.3f %10.3f" % (stats.name, stats.calls, stats.timed_calls,
+                         stats.total_ns / 1e6, stats.self_ns / 1e6, mean_us))
+
+        if histograms:
+            for stats in self.results():
+                lines.append("")
+                lines.append("%s:" % stats.name)
+                most = max(stats.histogram)
+                for bucket, count in enumerate(stats.histogram):
+                    if count:
+                        bar = "#" * max(1, 40 * count // most)
+                        lines.append("  < %10.3f us %10d %s" % (2 ** bucket / 1000.0, count, bar))
+
+        return "\n".join(lines)
+
+    def to_json(self):
+        import json
+        return json.dumps({
+            "sample_every": self.sample_every,
+            "functions": [stats.to_dict() for stats in self.results()],
+        }, indent=2)
+
+
+# The profiler used by the samples, and shortcuts to its methods
+PROFILER = Profiler()
+profile = PROFILER.profile
+enable = PROFILER.enable
+disable = PROFILER.disable
+reset = PROFILER.reset
+report = PROFILER.report
+
+def _report_at_exit():
+    import sys
+    print(PROFILER.report(histograms=True), file=sys.stderr)
+
+if os.environ.get("SAMPLES_PROFILE"):
+    import atexit
+    enable(float(os.environ["SAMPLES_PROFILE"]))
+    atexit.register(_report_at_exit)
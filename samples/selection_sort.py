@@ -1,3 +1,6 @@
+import heapq
+
+
 def selection_sort(items):
     """Sorts a list of items into ascending order using the
        selection sort algoright.
@@ -17,6 +20,101 @@ def selection_sort(items):
     return items
 
 
+# Below this ratio of k to the number of items, a heap of k items is cheaper
+# than partitioning all of them
+HEAP_SELECT_RATIO = 0.1
+
+
+def partition(items, start, end, pivot):
+    """Rearrange items[start:end] into the items less than pivot, the items
+       equal to pivot and the items greater than pivot, and return the
+       positions where the equal items start and end.
+       """
+    lt, i, gt = start, start, end
+    while i < gt:
+        item = items[i]
+        if item < pivot:
+            items[i] = items[lt]
+            items[lt] = item
+            lt += 1
+            i += 1
+        elif pivot < item:
+            gt -= 1
+            items[i] = items[gt]
+            items[gt] = item
+        else:
+            i += 1
+    return lt, gt
+
+
+def nth_element(items, k):
+    """Rearrange items so that items[k] is the item which would be there if
+       the list were sorted, with no greater items before it and no smaller
+       items after it, and return items[k]. This uses quickselect, in
+       expected linear time; if the pivots keep turning out badly, the
+       section which is left is sorted instead, so the worst case is
+       O(n log n).
+       """
+    n = len(items)
+    if not 0 <= k < n:
+        raise IndexError("k is out of range")
+
+    start, end = 0, n
+    depth_limit = 2 * n.bit_length()
+
+    while end - start > 1:
+        if depth_limit == 0:
+            items[start:end] = sorted(items[start:end])
+            break
+        depth_limit -= 1
+
+        # use the median of the first, middle and last items as the pivot
+        first, middle, last = items[start], items[(start + end) // 2], items[end - 1]
+        if middle < first:
+            first, middle = middle, first
+        if last < middle:
+            middle = first if last < first else last
+        lt, gt = partition(items, start, end, middle)
+
+        if k < lt:
+            end = lt
+        elif k >= gt:
+            start = gt
+        else: # items[k] is equal to the pivot
+            break
+
+    return items[k]
+
+
+def stream_k_smallest(iterable, k):
+    """Return the k smallest items from an iterable, in ascending order. Only
+       k items are kept in memory at a time, so the iterable can be of any
+       length.
+       """
+    # heapq.nsmallest keeps a heap of the k smallest items seen so far
+    return heapq.nsmallest(k, iterable)
+
+
+def select_k_smallest(items, k):
+    """Return a sorted list of the k smallest items. A heap is used when k is
+       small compared to the number of items, and quickselect otherwise. The
+       items themselves are not changed.
+       """
+    n = len(items)
+    if k <= 0:
+        return []
+    if k >= n:
+        return sorted(items)
+    if k < n * HEAP_SELECT_RATIO:
+        return stream_k_smallest(items, k)
+
+    items = list(items)
+    nth_element(items, k - 1)
+    smallest = items[:k]
+    smallest.sort()
+    return smallest
+
+
 if __name__ == "__main__":
     print(selection_sort([5, 4, 3, 2, 1]))
     print(selection_sort([3, 2, 3, 1, 5]))
@@ -25,3 +123,8 @@ if __name__ == "__main__":
     print(selection_sort([2, 1]))
     print(selection_sort([1, 2]))
     print(selection_sort([3, 3]))
+
+    print(select_k_smallest([5, 4, 3, 2, 1], 2))
+    print(select_k_smallest(list(range(100, 0, -1)), 5))
+    print(nth_element([3, 2, 3, 1, 5], 2))
+    print(stream_k_smallest(iter(range(1000000, 0, -1)), 3))
@@ -0,0 +1,271 @@
+"""Measure how the number of operations done by selection_sort and
+   merge_sort, and the time they take, grows with the number of items, and
+   find the complexity class which fits best:
+
+       python sort_complexity.py --sizes 100 200 400 800 1600
+
+   The sorts themselves are not changed. Instead, instrument compiles a
+   second copy of their source in which each comparison between items,
+   each write to a list and each access to a scratch buffer also adds one
+   to a counter, so the normal functions still pay nothing. The times are
+   measured on the normal functions.
+   """
+import argparse
+import ast
+import inspect
+import math
+import random
+import sys
+import textwrap
+
+import merge_sort
+import selection_sort
+from bench.runner import best_of
+
+
+class OperationCounts:
+    """The operations counted by instrumented functions."""
+    __slots__ = ("comparisons", "swaps", "writes", "scratch_reads", "scratch_writes")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    # These are called by the instrumented code, and return what they are
+    # given so that they can be wrapped around an expression
+
+    def compared(self, result):
+        self.comparisons += 1
+        return result
+
+    def read_scratch(self, item):
+        self.scratch_reads += 1
+        return item
+
+    def written(self, items):
+        # for an assignment to a slice
+        items = list(items)
+        self.writes += len(items)
+        return items
+
+
+class Instrumenter(ast.NodeTransformer):
+    """Adds counting to the AST of a function. A comparison is counted as a
+       comparison between items if one side of it is a subscript, like
+       items[i] < items[j], so that comparisons between indices are left
+       out. Every assignment to a subscript is a write, and three writes
+       which exchange two items through a temporary variable, or a tuple
+       assignment like a[i], a[j] = a[j], a[i], also count as a swap.
+       """
+
+    def __init__(self, scratch):
+        self.scratch = scratch
+
+    def is_scratch(self, node):
+        return isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id in self.scratch
+
+    def count(self, field):
+        return ast.parse("_counts.%s += 1" % field).body[0]
+
+    def call(self, method, node):
+        function = ast.Attribute(value=ast.Name(id="_counts", ctx=ast.Load()), attr=method, ctx=ast.Load())
+        return ast.Call(func=function, args=[node], keywords=[])
+
+    def visit_FunctionDef(self, node):
+        node.decorator_list = [] # the decorators have already been applied to the original
+        self.generic_visit(node)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left] + node.comparators
+        if not any(isinstance(operand, ast.Subscript) for operand in operands):
+            return node
+        for i in range(len(node.ops)):
+            node = self.call("compared", node)
+        return node
+
+    def visit_Subscript(self, node):
+        self.generic_visit(node)
+        if isinstance(node.ctx, ast.Load) and self.is_scratch(node):
+            return self.call("read_scratch", node)
+        return node
+
+    def visit_Assign(self, node):
+        self.generic_visit(node)
+        targets = []
+        for target in node.targets:
+            targets.extend(target.elts if isinstance(target, ast.Tuple) else [target])
+
+        counts = []
+        for target in targets:
+            if not isinstance(target, ast.Subscript):
+                continue
+            if isinstance(target.slice, ast.Slice):
+                node.value = self.call("written", node.value)
+            else:
+                counts.append(self.count("writes"))
+            if self.is_scratch(target):
+                counts.append(self.count("scratch_writes"))
+        if len(node.targets) == 1 and isinstance(node.targets[0], ast.Tuple) and len(counts) >= 2:
+            counts.append(self.count("swaps"))
+        return counts + [node]
+
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        # look for a swap through a temporary variable in each list of statements
+        for field in ("body", "orelse", "finalbody"):
+            statements = getattr(node, field, None)
+            if isinstance(statements, list) and statements and isinstance(statements[0], ast.stmt):
+                setattr(node, field, self.count_swaps(statements))
+        return node
+
+    def count_swaps(self, statements):
+        # the counts added in front of the writes are AugAssigns, so the
+        # assignments are the statements which are left
+        result = list(statements)
+        for i in range(len(statements)):
+            assignments = [s for s in statements[i:] if not isinstance(s, ast.AugAssign)][:3]
+            if len(assignments) < 3 or not all(isinstance(s, ast.Assign) and len(s.targets) == 1 for s in assignments):
+                continue
+            first, second, third = assignments
+            # temporary = a[i]; a[i] = a[j]; a[j] = temporary
+            if (isinstance(first.targets[0], ast.Name) and isinstance(second.targets[0], ast.Subscript)
+                    and same(first.value, second.targets[0]) and same(third.targets[0], second.value)
+                    and same(third.value, first.targets[0])):
+                result[result.index(third)] = [self.count("swaps"), third]
+        return [statement for item in result for statement in (item if isinstance(item, list) else [item])]
+
+
+def same(a, b):
+    # compare two expressions, ignoring whether they are loaded or stored
+    return ast.unparse(a) == ast.unparse(b)
+
+
+def instrument(module, names, scratch=()):
+    """Compile counting copies of the functions called names from module,
+       and return them in a dict along with "_counts", the OperationCounts
+       they add to. The copies call each other rather than the originals.
+       scratch names the variables which hold scratch buffers.
+       """
+    namespace = dict(vars(module))
+    namespace["_counts"] = OperationCounts()
+    for name in names:
+        # the module's own function, not the profiled version if profiling is on
+        function = inspect.unwrap(getattr(module, name))
+        tree = ast.parse(textwrap.dedent(inspect.getsource(function)))
+        tree = ast.fix_missing_locations(Instrumenter(set(scratch)).visit(tree))
+        exec(compile(tree, "<instrumented %s>" % inspect.getsourcefile(function), "exec"), namespace)
+    return namespace
+
+
+def instrumented_sorts():
+    """Return (name, normal sort, instrumented sort, counts) for each sort."""
+    selection = instrument(selection_sort, ["selection_sort"])
+    merge = instrument(merge_sort, ["merge", "merge_sort"], scratch=["temporary_storage"])
+    return [
+        ("selection_sort", selection_sort.selection_sort, selection["selection_sort"], selection["_counts"]),
+        ("merge_sort", merge_sort.merge_sort, merge["merge_sort"], merge["_counts"]),
+    ]
+
+
+# name: the function of n which the measurements are fitted to
+COMPLEXITY_CLASSES = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(n),
+    "O(n)": lambda n: float(n),
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n^2)": lambda n: float(n) ** 2,
+    "O(n^3)": lambda n: float(n) ** 3,
+}
+
+
+def fit(sizes, values):
+    """Fit values to c * f(n) for each complexity class by least squares,
+       and return (class, c, error) for the class with the smallest error,
+       which is the root mean square of the relative differences.
+       """
+    best = None
+    for name, f in COMPLEXITY_CLASSES.items():
+        fs = [f(n) for n in sizes]
+        c = sum(y * x for x, y in zip(fs, values)) / sum(x * x for x in fs)
+        error = math.sqrt(sum(((y - c * x) / y) ** 2 for x, y in zip(fs, values) if y) / len(values))
+        if best is None or error < best[2]:
+            best = name, c, error
+    return best
+
+
+def measure(sizes, repeat=3, seed=0):
+    """Return {sort name: {measurement: [value at each size]}}."""
+    measurements = {}
+    for name, function, instrumented, counts in instrumented_sorts():
+        rows = measurements[name] = {field: [] for field in OperationCounts.__slots__ + ("seconds",)}
+        for n in sizes:
+            rng = random.Random("%s:%d" % (seed, n))
+            items = [rng.random() for i in range(n)]
+            counts.reset()
+            result = instrumented(list(items))
+            assert result == sorted(items)
+            for field, value in counts.to_dict().items():
+                rows[field].append(value)
+            rows["seconds"].append(best_of(repeat, function, prepare=lambda: list(items)))
+    return measurements
+
+
+def print_tables(sizes, measurements):
+    for name, rows in measurements.items():
+        print(name)
+        print("  %-15s %s  %-10s %s" % ("", " ".join("%12d" % n for n in sizes), "fit", "error"))
+        for field, values in rows.items():
+            if not any(values):
+                continue
+            complexity, c, error = fit(sizes, values)
+            cells = " ".join(("%12.6f" if field == "seconds" else "%12d") % value for value in values)
+            print("  %-15s %s  %-10s %5.1f%%" % (field, cells, complexity, error * 100))
+        print()
+
+
+def plot(sizes, measurements, filename):
+    import matplotlib # only needed for --plot
+    matplotlib.use("Agg")
+    from matplotlib import pyplot
+
+    figure, axes = pyplot.subplots(1, len(measurements), figsize=(6 * len(measurements), 5))
+    for ax, (name, rows) in zip(axes, measurements.items()):
+        for field, values in rows.items():
+            if field != "seconds" and any(values):
+                ax.loglog(sizes, values, marker="o", label="%s, %s" % (field, fit(sizes, values)[0]))
+        ax.set_title(name)
+        ax.set_xlabel("items")
+        ax.set_ylabel("operations")
+        ax.legend()
+    figure.savefig(filename)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count the operations done by the sorts and fit their complexity.")
+    parser.add_argument("-s", "--sizes", help="the numbers of items to sort", type=int, nargs="+",
+                        default=[100, 200, 400, 800, 1600])
+    parser.add_argument("-r", "--repeat", help="the number of timed runs at each size", type=int, default=3)
+    parser.add_argument("--seed", help="the seed for the generated inputs", type=int, default=0)
+    parser.add_argument("--json", help="print the measurements as JSON", action="store_true")
+    parser.add_argument("--plot", help="save a log-log plot of the counts in this file (needs matplotlib)")
+    opts = parser.parse_args()
+
+    if min(opts.sizes) < 2:
+        sys.exit("The sizes must be at least 2.")
+
+    measurements = measure(opts.sizes, opts.repeat, opts.seed)
+    if opts.json:
+        import json
+        print(json.dumps({"sizes": opts.sizes, "measurements": measurements}, indent=2))
+    else:
+        print_tables(opts.sizes, measurements)
+    if opts.plot:
+        plot(opts.sizes, measurements, opts.plot)
@@ -0,0 +1,100 @@
+import unittest
+import io
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from argtest import evaluate_line, evaluate_stream, serve
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def run_stream(chunks):
+    chunks = list(chunks)
+    output = io.BytesIO()
+    count = evaluate_stream(lambda: chunks.pop(0) if chunks else b"", output.write, lambda: None)
+    return count, output.getvalue().decode()
+
+class TestEvaluate(unittest.TestCase):
+    def test_evaluate_line(self):
+        self.assertEqual(evaluate_line("1 2 add"), "3\n")
+        self.assertEqual(evaluate_line(b"6 3 div\r"), "2.0\n")
+        self.assertEqual(evaluate_line("1 2 pow"), "error: unknown operation\n")
+        self.assertEqual(evaluate_line("1 0 div"), "error: division by zero\n")
+        self.assertTrue(evaluate_line("1 x add").startswith("error:"))
+        self.assertTrue(evaluate_line("1 2").startswith("error:"))
+        self.assertTrue(evaluate_line(b"\xff").startswith("error:"))
+
+    def test_stream(self):
+        self.assertEqual(run_stream([b"1 2 add\n3 4 ", b"mul\n5 1 sub"]), (3, "3\n12\n4\n"))
+
+    def test_bad_lines_do_not_stop_the_stream(self):
+        self.assertEqual(run_stream([b"1 2 add\n\xff\n2 2 mul\n"]), (3, "3\nerror: 'utf-8' codec can't decode "
+                                                                       "byte 0xff in position 0: invalid start "
+                                                                       "byte\n4\n"))
+
+    def test_blank_lines_skipped(self):
+        self.assertEqual(run_stream([b"\n1 2 add\n  \n\n", b"2 2 mul\n\n"]), (2, "3\n4\n"))
+
+class TestCommandLine(unittest.TestCase):
+    def run_argtest(self, *args, **kwargs):
+        return subprocess.run([sys.executable, "argtest.py"] + list(args), cwd=HERE, stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, universal_newlines=True, **kwargs)
+
+    def test_simple_arguments(self):
+        # the usual case, which is handled without argparse
+        self.assertEqual(self.run_argtest("6", "7", "mul").stdout, "42\n")
+        self.assertEqual(self.run_argtest("-v", "6", "7", "mul").stdout, "42\n")
+
+    def test_batch(self):
+        process = self.run_argtest("--batch", "-", input="1 2 add\n\n8 2 div\n")
+        self.assertEqual(process.stdout, "3\n4.0\n")
+        self.assertIn("2 operations", process.stderr)
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets are not available")
+class TestServe(unittest.TestCase):
+    def test_path_in_use(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            socket_path = os.path.join(temp_dir, "argtest.sock")
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as running:
+                running.bind(socket_path)
+                running.listen()
+                # a second server must fail without removing the first one's socket
+                self.assertRaises(OSError, serve, socket_path)
+                self.assertTrue(os.path.exists(socket_path))
+
+    def test_requests(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            socket_path = os.path.join(temp_dir, "argtest.sock")
+            server = subprocess.Popen([sys.executable, "argtest.py", "--serve", socket_path], cwd=HERE)
+            try:
+                deadline = time.monotonic() + 10
+                while not os.path.exists(socket_path):
+                    self.assertIsNone(server.poll(), "the server exited")
+                    self.assertLess(time.monotonic(), deadline, "the server did not start")
+                    time.sleep(0.01)
+
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                    client.connect(socket_path)
+                    replies = client.makefile("rb")
+                    # one line at a time: each answer comes back before the next line is sent
+                    client.sendall(b"1 2 add\n")
+                    self.assertEqual(replies.readline(), b"3\n")
+                    client.sendall(b"1 0 div\n")
+                    self.assertEqual(replies.readline(), b"error: division by zero\n")
+                    # many lines at once, and a last line without a newline
+                    client.sendall(b"2 3 mul\n\n9 4 sub\n5 5 add")
+                    client.shutdown(socket.SHUT_WR)
+                    self.assertEqual(replies.read(), b"6\n5\n10\n")
+                    replies.close()
+            finally:
+                server.send_signal(signal.SIGINT)
+                self.assertEqual(server.wait(10), 0)
+            # the server removes its socket when it stops
+            self.assertFalse(os.path.exists(socket_path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import csv
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from argtest2 import record_end, record_ranges, reorder
+
+class TestRecordBoundaries(unittest.TestCase):
+    def test_record_end(self):
+        data = b'a,b\n"multi\nline",x\n1,2\n'
+        self.assertEqual(record_end(data, 0, 0), 4)
+        # the newline inside the quoted field does not end the record
+        self.assertEqual(record_end(data, 4, 4), 19)
+        self.assertEqual(record_end(data, 4, 12), 19)
+        self.assertEqual(record_end(data, 19, 19), len(data))
+
+    def test_stray_and_escaped_quotes(self):
+        # a quote inside an unquoted field is an ordinary character
+        data = b'x,5" pipe\n"a ""quoted""\nword",y\nz\n'
+        self.assertEqual(record_end(data, 0, 0), 10)
+        self.assertEqual(record_end(data, 10, 10), len(data) - 2)
+        # a quote after a closing quote does not open a field either
+        data = b'"a"b"\nc\n'
+        self.assertEqual(record_end(data, 0, 0), 6)
+
+    def test_no_final_newline(self):
+        self.assertEqual(record_end(b'a,b\nc,d', 4, 4), 7)
+
+    def test_record_ranges(self):
+        data = b'h\n' + b''.join(b'%d,"two\nlines",3"\n' % i for i in range(100))
+        ranges = record_ranges(data, 2, 50)
+        self.assertEqual(ranges[0][0], 2)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (start_1, end_1), (start_2, end_2) in zip(ranges, ranges[1:]):
+            self.assertEqual(end_1, start_2)
+        for start, end in ranges:
+            self.assertTrue(data[start:end].endswith(b'"\n'))
+
+class TestReorder(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.temp_dir.name, "input.csv")
+        rng = random.Random(0)
+        with open(self.input_file, "w", newline='') as f:
+            w = csv.writer(f)
+            w.writerow(["a", "b", "c"])
+            for i in range(4000):
+                w.writerow([i, rng.choice(['plain', 'multi\nline', 'with "quotes"', 'comma, here']), rng.random()])
+        with open(self.input_file, "a", newline='') as f:
+            f.write('x,5" pipe,1\n')
+            f.write('"multi\nline",y,2\n')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self, filename):
+        with open(filename, newline='') as f:
+            return f.read()
+
+    def test_jobs_match_serial(self):
+        serial = os.path.join(self.temp_dir.name, "serial.csv")
+        reorder(self.input_file, serial, "c,0,b", jobs=1)
+        with open(serial, newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["c", "a", "b"])
+        self.assertEqual(rows[-2], ["1", "x", '5" pipe'])
+        self.assertEqual(len(rows), 4003)
+
+        parallel = os.path.join(self.temp_dir.name, "parallel.csv")
+        reorder(self.input_file, parallel, "c,0,b", jobs=4)
+        self.assertEqual(self.read(parallel), self.read(serial))
+
+    def test_jobs_below_one(self):
+        output_file = os.path.join(self.temp_dir.name, "output.csv")
+        for jobs in (0, -1):
+            with self.assertRaises(ValueError):
+                reorder(self.input_file, output_file, "c,0,b", jobs=jobs)
+            process = subprocess.run([sys.executable, "argtest2.py", self.input_file, "c,0,b", "-o", output_file,
+                                      "-j", str(jobs)], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                     stderr=subprocess.PIPE, universal_newlines=True)
+            self.assertEqual(process.returncode, 2)
+            self.assertIn("invalid positive_int value", process.stderr)
+        self.assertFalse(os.path.exists(output_file))
+
+if __name__ == "__main__":
+    unittest.main()
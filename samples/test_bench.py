@@ -0,0 +1,39 @@
+import unittest
+import random
+
+from bench import compare, runner
+from bench.workloads import WORKLOADS
+
+def results(times_by_workload):
+    return {
+        "environment": {},
+        "results": [{"workload": name, "size": 10, "times": times} for name, times in times_by_workload.items()],
+    }
+
+class TestCompare(unittest.TestCase):
+    def test_ranks(self):
+        self.assertEqual(compare.ranks([30, 10, 20, 20]), [4, 1, 2.5, 2.5])
+
+    def test_mann_whitney(self):
+        low = [1.0 + i / 100.0 for i in range(10)]
+        high = [2.0 + i / 100.0 for i in range(10)]
+        self.assertLess(compare.mann_whitney_greater(high, low), 0.001)
+        self.assertGreater(compare.mann_whitney_greater(low, high), 0.99)
+        self.assertEqual(compare.mann_whitney_greater([1.0] * 5, [1.0] * 5), 1.0)
+
+    def test_compare(self):
+        rng = random.Random(0)
+        noise = lambda centre: [centre * rng.uniform(0.97, 1.03) for i in range(10)]
+        baseline = results({"same": noise(1.0), "slower": noise(1.0), "faster": noise(1.0), "tiny": noise(1.0)})
+        current = results({"same": noise(1.0), "slower": noise(1.5), "faster": noise(0.5), "tiny": noise(1.04)})
+
+        verdicts = {workload: verdict for workload, size, old, new, p, verdict in compare.compare(baseline, current)}
+        # a change smaller than the threshold is not reported, even if it is significant
+        self.assertEqual(verdicts, {"same": "", "slower": "slower", "faster": "faster", "tiny": ""})
+
+class TestRunner(unittest.TestCase):
+    def test_run(self):
+        run = runner.run(sizes=[100], repeat=2)
+        self.assertEqual(sorted(result["workload"] for result in run["results"]), sorted(WORKLOADS))
+        self.assertTrue(all(len(result["times"]) == 2 for result in run["results"]))
+        self.assertIn("python", run["environment"])
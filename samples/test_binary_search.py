@@ -0,0 +1,66 @@
+import unittest
+import bisect
+import random
+
+import binary_search
+from binary_search import iterative_binary_search, search_left, search_many, search_right
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.items = sorted(rng.randrange(50) for i in range(200)) # with duplicates
+        self.queries = list(range(-1, 52))
+
+    def test_bisect(self):
+        for query in self.queries:
+            self.assertEqual(search_left(self.items, query), bisect.bisect_left(self.items, query))
+            self.assertEqual(search_right(self.items, query), bisect.bisect_right(self.items, query))
+            for start, end in ((0, 0), (10, 150), (100, 200), (199, 200)):
+                self.assertEqual(search_left(self.items, query, start, end),
+                                 bisect.bisect_left(self.items, query, start, end))
+                self.assertEqual(search_right(self.items, query, start, end),
+                                 bisect.bisect_right(self.items, query, start, end))
+
+    def test_key(self):
+        records = [("name%d" % i, value) for i, value in enumerate(self.items)]
+        second = lambda record: record[1]
+        for query in self.queries:
+            self.assertEqual(search_left(records, query, key=second), bisect.bisect_left(self.items, query))
+            self.assertEqual(search_right(records, query, key=second), bisect.bisect_right(self.items, query))
+
+    def test_iterative_binary_search(self):
+        for query in self.queries:
+            if query in self.items:
+                self.assertEqual(iterative_binary_search(self.items, query), self.items.index(query))
+            else:
+                self.assertRaises(ValueError, iterative_binary_search, self.items, query)
+                self.assertIsNone(iterative_binary_search(self.items, query, default=None))
+                self.assertEqual(iterative_binary_search(self.items, query, default=-1), -1)
+
+        # a hit outside start:end is a miss
+        first = self.items[0]
+        self.assertEqual(iterative_binary_search(self.items, first, start=150, default="missing"), "missing")
+        self.assertEqual(iterative_binary_search([(1, "a"), (3, "b")], 3, key=lambda pair: pair[0]), 1)
+
+    def expected(self, queries, default=None):
+        return [self.items.index(query) if query in self.items else default for query in queries]
+
+    def test_search_many(self):
+        rng = random.Random(1)
+        # a few queries are binary searched, many are merged with the list
+        for queries in (self.queries[:3], [rng.randrange(-5, 55) for i in range(1000)], [], self.queries[::-1]):
+            self.assertEqual(search_many(self.items, queries), self.expected(queries))
+            self.assertEqual(search_many(self.items, queries, default=-1), self.expected(queries, -1))
+
+        records = [(value,) for value in self.items]
+        self.assertEqual(search_many(records, self.queries[:3], key=lambda record: record[0]),
+                         self.expected(self.queries[:3]))
+        self.assertEqual(search_many(records, self.queries, key=lambda record: record[0]), self.expected(self.queries))
+
+    @unittest.skipIf(binary_search.numpy is None, "NumPy is not installed")
+    def test_search_many_numpy(self):
+        items = binary_search.numpy.array(self.items)
+        self.assertEqual(search_many(items, self.queries), self.expected(self.queries))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import random
+import re
+
+from calculator import NumberInput, sum_column, EXACT
+
+class TestNumberInput(unittest.TestCase):
+    def test_edits(self):
+        # compare the value after every keystroke with the whole text parsed from scratch
+        rng = random.Random(0)
+        number_input = NumberInput()
+        text = ""
+        for i in range(5000):
+            position = rng.randrange(len(text) + 1) if rng.random() < 0.2 else len(text)
+            if text and rng.random() < 0.3:
+                new_text = text[:position - 1] + text[position:] if position else text[1:]
+            else:
+                new_text = text[:position] + rng.choice("0123456789-+x") + text[position:]
+
+            valid = re.fullmatch(r"[-+]?[0-9]*", new_text) is not None
+            self.assertEqual(number_input.edit(new_text), valid, new_text)
+            if valid:
+                text = new_text
+            digits = text.lstrip("-+")
+            self.assertEqual(number_input.value, -int(digits or 0) if text.startswith("-") else int(digits or 0))
+
+    def test_long_numbers(self):
+        # longer than an int can be converted to or from a string by default
+        number_input = NumberInput()
+        number_input.edit("9" * 10000)
+        number_input.edit("9" * 10001)
+        self.assertEqual(str(EXACT.add(number_input.value, 1)), "1" + "0" * 10001)
+        number_input.edit("9" * 3)
+        self.assertEqual(number_input.value, 999)
+
+class TestSumColumn(unittest.TestCase):
+    def test_sum(self):
+        numbers = [random.randrange(-10 ** 30, 10 ** 30) for i in range(5000)]
+        text = "\n".join(map(str, numbers)) + "\n\n  +7 \n"
+        self.assertEqual(sum_column(text), sum(numbers) + 7)
+        self.assertEqual(sum_column(""), 0)
+
+    def test_invalid(self):
+        for text in ("1\n2\nthree\n", "1.5", "-", "1e5", "NaN"):
+            self.assertRaises(ValueError, sum_column, text)
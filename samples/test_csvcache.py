@@ -0,0 +1,80 @@
+import unittest
+import csv
+import os
+import random
+import tempfile
+
+from argtest2 import reorder
+from csvcache import cache_dir_for, ingest, open_cache, reorder_cached
+
+class TestColumnCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.temp_dir.name, "input.csv")
+        rng = random.Random(0)
+        with open(self.input_file, "w", newline='', encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["id", "name", "value"])
+            for i in range(25000): # more than one chunk of rows
+                w.writerow([i, rng.choice(["plain", "multi\nline", 'with "quotes"', "comma, here", "", "café"]),
+                            rng.random()])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self, filename):
+        with open(filename, newline='', encoding="utf-8") as f:
+            return f.read()
+
+    def test_ingest(self):
+        self.assertIsNone(open_cache(self.input_file))
+        cache_dir = ingest(self.input_file)
+        self.assertEqual(cache_dir, cache_dir_for(self.input_file))
+
+        meta = open_cache(self.input_file)
+        self.assertEqual((meta["rows"], meta["width"], meta["header"]), (25001, 3, ["id", "name", "value"]))
+
+    def test_matches_reorder(self):
+        for order in ("2,0,1", "name,name", "-1", "value,id"):
+            expected = os.path.join(self.temp_dir.name, "expected.csv")
+            cached = os.path.join(self.temp_dir.name, "cached.csv")
+            reorder(self.input_file, expected, order)
+            reorder_cached(self.input_file, cached, order)
+            self.assertEqual(self.read(cached), self.read(expected))
+
+    def test_invalidation(self):
+        ingest(self.input_file)
+        stat = os.stat(self.input_file)
+
+        # a new modification time is enough to make the cache out of date
+        os.utime(self.input_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(open_cache(self.input_file))
+        ingest(self.input_file)
+        self.assertIsNotNone(open_cache(self.input_file))
+
+        # and so is a new size, even with the same modification time
+        with open(self.input_file, "a", newline='', encoding="utf-8") as f:
+            f.write("25000,added,0.5\r\n")
+        os.utime(self.input_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertIsNone(open_cache(self.input_file))
+
+        # reorder_cached rebuilds the cache, and sees the new row
+        output_file = os.path.join(self.temp_dir.name, "output.csv")
+        reorder_cached(self.input_file, output_file, "name")
+        self.assertTrue(self.read(output_file).endswith("added\r\n"))
+        self.assertEqual(open_cache(self.input_file)["rows"], 25002)
+
+    def test_short_row(self):
+        with open(self.input_file, "a", newline='') as f:
+            f.write("1,2\r\n")
+        self.assertRaises(ValueError, ingest, self.input_file)
+        self.assertFalse(os.path.exists(cache_dir_for(self.input_file)))
+
+    def test_empty(self):
+        open(self.input_file, "w").close()
+        output_file = os.path.join(self.temp_dir.name, "output.csv")
+        reorder_cached(self.input_file, output_file, "0")
+        self.assertEqual(self.read(output_file), "")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import random
+import sys
+import tempfile
+
+from external_sort import external_sort
+
+class TestExternalSort(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.temp_dir.name, "input.txt")
+        self.output_file = os.path.join(self.temp_dir.name, "output.txt")
+
+        rng = random.Random(0)
+        self.lines = [b"%04d\n" % rng.randrange(10000) for i in range(1000)]
+        with open(self.input_file, "wb") as f:
+            f.writelines(self.lines)
+        self.size = sum(len(line) for line in self.lines)
+        # the memory used for each line, as sorted_runs counts it
+        self.line_memory = sys.getsizeof(self.lines[0]) + 8
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def output(self):
+        with open(self.output_file, "rb") as f:
+            return f.readlines()
+
+    def test_in_memory(self):
+        stats = external_sort(self.input_file, self.output_file)
+        self.assertEqual(self.output(), sorted(self.lines))
+        # one batch is sorted in memory and written straight out, without a run file or a merge
+        self.assertEqual((stats.spills, stats.merge_passes), (0, 0))
+        self.assertEqual((stats.bytes_read, stats.bytes_written), (self.size, self.size))
+
+    def test_two_runs(self):
+        # one line more than fits in a batch: both batches are spilled and merged
+        stats = external_sort(self.input_file, self.output_file, memory=999 * self.line_memory)
+        self.assertEqual(self.output(), sorted(self.lines))
+        self.assertEqual((stats.spills, stats.merge_passes), (2, 1))
+        self.assertEqual((stats.bytes_read, stats.bytes_written), (2 * self.size, 2 * self.size))
+
+    def test_spills_and_merge_passes(self):
+        for use_mmap in (False, True):
+            # 100 lines per run gives 10 runs, which take two passes when 3 are merged at once
+            stats = external_sort(self.input_file, self.output_file, memory=100 * self.line_memory,
+                                  max_merge=3, use_mmap=use_mmap)
+            self.assertEqual(self.output(), sorted(self.lines))
+            self.assertEqual((stats.spills, stats.merge_passes), (10, 3))
+            # the runs from 10 to 4 to 2, and then to the output file
+            self.assertEqual((stats.bytes_read, stats.bytes_written), (4 * self.size, 4 * self.size))
+
+    def test_key_and_no_final_newline(self):
+        with open(self.input_file, "wb") as f:
+            f.write(b"b 1\na 3\nc 2")
+        external_sort(self.input_file, self.output_file, key=lambda line: line.split()[1])
+        self.assertEqual(self.output(), [b"b 1\n", b"c 2\n", b"a 3\n"])
+
+    def test_empty(self):
+        open(self.input_file, "wb").close()
+        external_sort(self.input_file, self.output_file, use_mmap=True)
+        self.assertEqual(self.output(), [])
+
+    def test_max_merge(self):
+        for max_merge in (1, 0, -1):
+            self.assertRaises(ValueError, external_sort, self.input_file, self.output_file, max_merge=max_merge)
+
+if __name__ == "__main__":
+    unittest.main()
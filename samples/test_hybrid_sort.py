@@ -0,0 +1,38 @@
+import unittest
+import random
+
+from hybrid_sort import hybrid_sort
+
+class TestHybridSort(unittest.TestCase):
+    def test_small(self):
+        for items in ([], [1], [2, 1], [1, 2], [3, 3], [5, 4, 3, 2, 1], [3, 2, 3, 1, 5]):
+            self.assertEqual(hybrid_sort(list(items)), sorted(items))
+
+    def test_inputs(self):
+        rng = random.Random(0)
+        for n in (63, 64, 65, 1000, 5000):
+            random_items = [rng.randrange(n // 3) for i in range(n)]
+            nearly_sorted = sorted(random_items)
+            for i in range(5):
+                j = rng.randrange(n - 1)
+                nearly_sorted[j], nearly_sorted[j + 1] = nearly_sorted[j + 1], nearly_sorted[j]
+
+            for items in (random_items, sorted(random_items), sorted(random_items, reverse=True), nearly_sorted):
+                self.assertEqual(hybrid_sort(list(items)), sorted(items))
+
+    def test_stable_key_reverse(self):
+        rng = random.Random(1)
+        items = [(rng.randrange(10), i) for i in range(2000)]
+        first = lambda pair: pair[0]
+
+        self.assertEqual(hybrid_sort(list(items), key=first), sorted(items, key=first))
+        self.assertEqual(hybrid_sort(list(items), key=first, reverse=True), sorted(items, key=first, reverse=True))
+        self.assertEqual(hybrid_sort(list(items), reverse=True), sorted(items, reverse=True))
+
+    def test_in_place(self):
+        items = [3, 1, 2]
+        self.assertIs(hybrid_sort(items), items)
+        self.assertEqual(items, [1, 2, 3])
+
+if __name__ == "__main__":
+    unittest.main()
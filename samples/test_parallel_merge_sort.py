@@ -0,0 +1,58 @@
+import unittest
+import array
+import random
+
+from parallel_merge_sort import parallel_merge_sort
+
+class TestParallelMergeSort(unittest.TestCase):
+    def assertSortedLike(self, items, result):
+        # the same values, and the same types, as sorted() gives
+        expected = sorted(items)
+        self.assertEqual(result, expected)
+        self.assertEqual([type(item) for item in result], [type(item) for item in expected])
+
+    def test_sorted(self):
+        rng = random.Random(0)
+        for make in (rng.random, lambda: rng.randrange(-1000, 1000)):
+            for workers in (1, 2, 3, 4):
+                for n in (0, 1, 7, 8, 9, 100, 1001):
+                    items = [make() for i in range(n)]
+                    result = parallel_merge_sort(list(items), workers=workers)
+                    self.assertSortedLike(items, result)
+
+    def test_in_place(self):
+        items = [3, 1, 2, 5, 4, 0, 7, 6]
+        result = parallel_merge_sort(items, workers=2)
+        self.assertIs(result, items)
+        self.assertEqual(items, list(range(8)))
+
+    def test_array(self):
+        rng = random.Random(1)
+        for typecode in ('d', 'i', 'B'):
+            numbers = [rng.randrange(200) for i in range(500)]
+            items = array.array(typecode, numbers)
+            result = parallel_merge_sort(items, workers=3)
+            self.assertIs(result, items)
+            self.assertEqual(items.tolist(), sorted(numbers))
+
+    def test_values_which_a_buffer_would_change(self):
+        for items in ([2**70, 1, 2, 3], [-2**63 - 1, 5, 4, 3], [1, 2.5, 3, 0], [True, 3, False, 2],
+                      [1.5, 3, 2**80, -1.0], ["b", "d", "a", "c"]):
+            result = parallel_merge_sort(list(items), workers=2)
+            self.assertSortedLike(items, result)
+
+    def test_limits_of_q(self):
+        items = [2**63 - 1, -2**63, 0, 1]
+        self.assertSortedLike(items, parallel_merge_sort(list(items), workers=2))
+
+    def test_typecode(self):
+        items = [0.25, 0.5, -1.0, 3.0]
+        self.assertEqual(parallel_merge_sort(list(items), workers=2, typecode='f'), sorted(items))
+        for items, typecode in (([2**70, 1, 2, 3], 'q'), ([1, 2, 3, 4], 'd'), ([0.1, 0.2, 0.3, 0.4], 'f'),
+                                ([1.5, 1, 2, 3], 'q'), ([1, 2], 'd')):
+            with self.assertRaises(ValueError):
+                parallel_merge_sort(list(items), workers=2, typecode=typecode)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import json
+import time
+
+from profiling import Profiler
+
+profiler = Profiler()
+
+@profiler.profile
+def outer(n):
+    time.sleep(0.002)
+    for i in range(n):
+        inner()
+
+@profiler.profile
+def inner():
+    time.sleep(0.001)
+
+@profiler.profile
+def countdown(n):
+    return countdown(n - 1) if n else 0
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+
+    def test_disabled(self):
+        # nothing is swapped in until profiling is enabled
+        self.assertFalse(hasattr(inner, "__wrapped__"))
+        outer(2)
+        self.assertEqual(profiler.results(), [])
+
+    def test_times(self):
+        profiler.enable()
+        outer(3)
+        stats = {s.name: s for s in profiler.results()}
+        outer_stats, inner_stats = stats[__name__ + ".outer"], stats[__name__ + ".inner"]
+
+        self.assertEqual((outer_stats.calls, inner_stats.calls), (1, 3))
+        self.assertGreaterEqual(inner_stats.total_ns, 3000000)
+        self.assertEqual(inner_stats.self_ns, inner_stats.total_ns)
+        self.assertEqual(outer_stats.self_ns, outer_stats.total_ns - inner_stats.total_ns)
+        self.assertEqual(sum(inner_stats.histogram), 3)
+
+        profiler.disable()
+        outer(1)
+        self.assertEqual(outer_stats.calls, 1)
+
+    def test_recursion(self):
+        profiler.enable()
+        countdown(10)
+        stats = profiler.results()[0]
+        self.assertEqual(stats.calls, 11)
+        # the outermost call's time includes the others, so they are not added again
+        self.assertEqual(stats.total_ns, stats.self_ns)
+
+    def test_sampling(self):
+        profiler.enable(sample_rate=0.25)
+        for i in range(8):
+            outer(2)
+        stats = {s.name: s for s in profiler.results()}
+        self.assertEqual(stats[__name__ + ".outer"].calls, 8)
+        self.assertEqual(stats[__name__ + ".outer"].timed_calls, 2)
+        # whole call trees are sampled
+        self.assertEqual(stats[__name__ + ".inner"].timed_calls, 4)
+        self.assertRaises(ValueError, profiler.enable, 0)
+
+    def test_reports(self):
+        profiler.enable()
+        outer(1)
+        report = profiler.report(histograms=True)
+        self.assertIn(__name__ + ".inner", report)
+        functions = json.loads(profiler.to_json())["functions"]
+        self.assertEqual(sorted(f["calls"] for f in functions), [1, 1])
@@ -0,0 +1,58 @@
+import unittest
+import random
+
+from selection_sort import nth_element, select_k_smallest, selection_sort, stream_k_smallest
+
+class TestSelectionSort(unittest.TestCase):
+    def test_selection_sort(self):
+        for items in ([], [1], [2, 1], [1, 2], [3, 3], [5, 4, 3, 2, 1], [3, 2, 3, 1, 5]):
+            self.assertEqual(selection_sort(list(items)), sorted(items))
+
+class TestSelect(unittest.TestCase):
+    def inputs(self):
+        rng = random.Random(0)
+        for n in (1, 2, 3, 10, 100, 1000):
+            yield [rng.randrange(n) for i in range(n)] # lots of duplicates
+            yield [rng.random() for i in range(n)]
+            yield list(range(n))
+            yield list(range(n, 0, -1))
+            yield [7] * n
+
+    def test_nth_element(self):
+        for items in self.inputs():
+            n = len(items)
+            for k in {0, n // 2, n - 1}:
+                rearranged = list(items)
+                self.assertEqual(nth_element(rearranged, k), sorted(items)[k])
+                self.assertEqual(sorted(rearranged), sorted(items))
+                self.assertTrue(all(item <= rearranged[k] for item in rearranged[:k]))
+                self.assertTrue(all(rearranged[k] <= item for item in rearranged[k + 1:]))
+
+    def test_nth_element_out_of_range(self):
+        for k in (-1, 3, 4):
+            self.assertRaises(IndexError, nth_element, [1, 2, 3], k)
+        self.assertRaises(IndexError, nth_element, [], 0)
+
+    def test_select_k_smallest(self):
+        for items in self.inputs():
+            n = len(items)
+            # k below and above the ratio where a heap is used, and at the ends
+            for k in {0, 1, n // 20, n // 2, n - 1, n}:
+                original = list(items)
+                self.assertEqual(select_k_smallest(items, k), sorted(items)[:k])
+                self.assertEqual(items, original)
+
+    def test_select_k_out_of_range(self):
+        self.assertEqual(select_k_smallest([3, 1, 2], -1), [])
+        self.assertEqual(select_k_smallest([3, 1, 2], 10), [1, 2, 3])
+        self.assertEqual(select_k_smallest([], 2), [])
+
+    def test_stream_k_smallest(self):
+        rng = random.Random(1)
+        items = [rng.randrange(100) for i in range(5000)]
+        self.assertEqual(stream_k_smallest(iter(items), 10), sorted(items)[:10])
+        self.assertEqual(stream_k_smallest(iter(items), 0), [])
+        self.assertEqual(stream_k_smallest(iter([2, 1]), 5), [1, 2])
+
+if __name__ == "__main__":
+    unittest.main()
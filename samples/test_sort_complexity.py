@@ -0,0 +1,57 @@
+import unittest
+import random
+
+import merge_sort
+import selection_sort
+from sort_complexity import fit, instrument, instrumented_sorts
+
+class TestInstrumentedSorts(unittest.TestCase):
+    def test_selection_sort_counts(self):
+        sort = instrument(selection_sort, ["selection_sort"])
+        n = 50
+        rng = random.Random(0)
+        items = [rng.random() for i in range(n)]
+        self.assertEqual(len(set(items)), n)
+        self.assertEqual(sort["selection_sort"](list(items)), sorted(items))
+
+        # selection sort compares and exchanges the same number of times whatever the order of the items
+        counts = sort["_counts"]
+        self.assertEqual(counts.comparisons, n * (n + 1) // 2)
+        self.assertEqual((counts.swaps, counts.writes), (n, 2 * n))
+        self.assertEqual(counts.scratch_reads, 0)
+
+    def test_merge_sort_counts(self):
+        sort = instrument(merge_sort, ["merge", "merge_sort"], scratch=["temporary_storage"])
+        items = [8, 7, 6, 5, 4, 3, 2, 1]
+        self.assertEqual(sort["merge_sort"](list(items)), sorted(items))
+
+        # three levels of merges, each writing every item to the scratch buffer and back
+        counts = sort["_counts"]
+        self.assertEqual((counts.scratch_writes, counts.scratch_reads, counts.writes), (24, 24, 48))
+        self.assertEqual(counts.comparisons, 12)
+
+    def test_merge_sort_random(self):
+        sort = instrument(merge_sort, ["merge", "merge_sort"], scratch=["temporary_storage"])
+        rng = random.Random(1)
+        items = [rng.random() for i in range(1000)]
+        self.assertEqual(sort["merge_sort"](list(items)), sorted(items))
+
+        # every level merges all the items, and there are ceil(log2 n) levels
+        counts = sort["_counts"]
+        self.assertEqual(counts.scratch_writes, 1000 * 10)
+        self.assertLess(counts.comparisons, 1000 * 10)
+        self.assertGreater(counts.comparisons, 1000 * 10 // 2)
+
+    def test_originals_unchanged(self):
+        for name, function, instrumented, counts in instrumented_sorts():
+            self.assertIsNot(function, instrumented)
+            self.assertNotIn("_counts", function.__code__.co_names)
+
+    def test_fit(self):
+        sizes = [100, 200, 400, 800]
+        self.assertEqual(fit(sizes, [3 * n * n + 5 for n in sizes])[0], "O(n^2)")
+        self.assertEqual(fit(sizes, [2 * n for n in sizes])[0], "O(n)")
+        self.assertEqual(fit(sizes, [664, 1529, 3458, 7715])[0], "O(n log n)")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import array
+import random
+import threading
+
+from typed_merge_sort import TypedMergeSorter, typed_merge_sort
+
+class TestTypedMergeSort(unittest.TestCase):
+    def test_in_place(self):
+        rng = random.Random(0)
+        for typecode, make in (('d', rng.random), ('q', lambda: rng.randrange(-50, 50)), ('B', lambda: rng.randrange(256))):
+            for n in (0, 1, 2, 15, 16, 17, 100, 1000):
+                items = [make() for i in range(n)]
+                buffer = array.array(typecode, items)
+                self.assertIsNone(typed_merge_sort(buffer))
+                self.assertEqual(buffer.tolist(), sorted(items))
+
+    def test_memoryview(self):
+        buffer = array.array('i', [5, 3, 4, 1, 2])
+        typed_merge_sort(memoryview(buffer))
+        self.assertEqual(buffer.tolist(), [1, 2, 3, 4, 5])
+
+    def test_permutation(self):
+        rng = random.Random(1)
+        items = [rng.randrange(20) for i in range(500)]
+        buffer = array.array('l', items)
+        positions = typed_merge_sort(buffer, permutation=True)
+
+        # the same as a stable argsort
+        self.assertEqual(positions.tolist(), sorted(range(len(items)), key=items.__getitem__))
+        self.assertEqual([items[i] for i in positions], buffer.tolist())
+
+    def test_reuse(self):
+        sorter = TypedMergeSorter()
+        for n in (1000, 10, 2000):
+            items = list(range(n, 0, -1))
+            buffer = array.array('d', items)
+            sorter.sort(buffer)
+            self.assertEqual(buffer.tolist(), sorted(items))
+
+    def test_threads(self):
+        rng = random.Random(2)
+        inputs = [[rng.random() for i in range(2000)] for j in range(8)]
+        buffers = [array.array('d', items) for items in inputs]
+        threads = [threading.Thread(target=typed_merge_sort, args=(buffer,)) for buffer in buffers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for items, buffer in zip(inputs, buffers):
+            self.assertEqual(buffer.tolist(), sorted(items))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, typed_merge_sort, b"readonly")
+        self.assertRaises(TypeError, typed_merge_sort, memoryview(bytearray(8)).cast('c'))
+        self.assertRaises(ValueError, typed_merge_sort, memoryview(bytearray(8)).cast('B', (2, 4)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import array
+import random
+import subprocess
+import sys
+import threading
+
+from merge_sort import merge_sort
+
+# Sections this short are sorted with insertion sort before merging
+MIN_RUN = 16
+
+
+class TypedMergeSorter:
+    """Merge sort for flat buffers of ints or floats: array.array objects,
+       memoryviews, or anything else with the buffer protocol, such as NumPy
+       arrays. Items are sorted in place. The scratch buffers are kept
+       between calls and only grow, so sorting many buffers of similar sizes
+       allocates nothing after the first call. Because of this, a sorter
+       must not be used by more than one thread at a time.
+       """
+
+    def __init__(self):
+        self._scratch = {}
+
+    def _scratch_for(self, name, typecode, n):
+        scratch = self._scratch.get(name)
+        if scratch is None or scratch.typecode != typecode or len(scratch) < n:
+            scratch = self._scratch[name] = array.array(typecode, bytes(array.array(typecode).itemsize * n))
+        return memoryview(scratch)
+
+    def sort(self, buffer, permutation=False):
+        """Sort buffer in place. If permutation is true, also return an
+           array of the original positions of the sorted items, so that
+           item i of the result came from position permutation[i]. Equal
+           items keep their order.
+           """
+        view = memoryview(buffer)
+        if view.ndim != 1 or not view.contiguous:
+            raise ValueError("Only flat, contiguous buffers can be sorted.")
+        if view.readonly:
+            raise ValueError("The buffer is read-only.")
+        if view.format not in array.typecodes:
+            raise TypeError("Unsupported item format: '%s'" % view.format)
+
+        n = len(view)
+        scratch = self._scratch_for('items', view.format, n)
+
+        if permutation:
+            positions = array.array('q', range(n))
+            position_view = memoryview(positions)
+            position_scratch = self._scratch_for('positions', 'q', n)
+        else:
+            positions = position_view = position_scratch = None
+
+        for start in range(0, n, MIN_RUN):
+            _insertion_sort(view, position_view, start, min(start + MIN_RUN, n))
+
+        size_of_subsections = MIN_RUN
+        while size_of_subsections < n:
+            for start in range(0, n - size_of_subsections, size_of_subsections * 2):
+                middle = start + size_of_subsections
+                end = min(middle + size_of_subsections, n)
+                _merge(view, scratch, position_view, position_scratch, start, middle, end)
+            size_of_subsections *= 2
+
+        return positions
+
+
+def _insertion_sort(view, positions, start, end):
+    for i in range(start + 1, end):
+        item = view[i]
+        j = i
+        while j > start and item < view[j - 1]:
+            j -= 1
+        if j < i:
+            view[j + 1:i + 1] = view[j:i]
+            view[j] = item
+            if positions is not None:
+                position = positions[i]
+                positions[j + 1:i + 1] = positions[j:i]
+                positions[j] = position
+
+
+def _merge(view, scratch, positions, position_scratch, start, middle, end):
+    if not view[middle] < view[middle - 1]:
+        # the two sections are already in order
+        return
+
+    length_1 = middle - start
+    scratch[:length_1] = view[start:middle]
+    if positions is not None:
+        position_scratch[:length_1] = positions[start:middle]
+
+    i_1, i_2, i_t = 0, middle, start
+    item_1, item_2 = scratch[0], view[middle]
+
+    while True:
+        if item_2 < item_1:
+            view[i_t] = item_2
+            if positions is not None:
+                positions[i_t] = positions[i_2]
+            i_2 += 1
+            i_t += 1
+            if i_2 == end:
+                break
+            item_2 = view[i_2]
+        else:
+            view[i_t] = item_1
+            if positions is not None:
+                positions[i_t] = position_scratch[i_1]
+            i_1 += 1
+            i_t += 1
+            if i_1 == length_1:
+                break
+            item_1 = scratch[i_1]
+
+    # the rest of the second section is already in place
+    view[i_t:i_t + length_1 - i_1] = scratch[i_1:length_1]
+    if positions is not None:
+        positions[i_t:i_t + length_1 - i_1] = position_scratch[i_1:length_1]
+
+
+# each thread gets its own sorter, so that threads never share scratch buffers
+_local = threading.local()
+
+
+def typed_merge_sort(buffer, permutation=False):
+    """Sort a typed buffer in place with this thread's TypedMergeSorter."""
+    sorter = getattr(_local, "sorter", None)
+    if sorter is None:
+        sorter = _local.sorter = TypedMergeSorter()
+    return sorter.sort(buffer, permutation)
+
+
+def _peak_rss(kind, n):
+    # run in a fresh process, so that each measurement starts from nothing
+    import resource # only available on Unix, and only needed for this measurement
+    rng = random.Random(0)
+    if kind == "list":
+        merge_sort([rng.random() for i in range(n)])
+    else:
+        typed_merge_sort(array.array('d', (rng.random() for i in range(n))))
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        print(_peak_rss(sys.argv[1], int(sys.argv[2])))
+        sys.exit()
+
+    baseline = int(subprocess.check_output([sys.executable, __file__, "list", "0"]))
+    for n in (100000, 1000000):
+        for kind in ("list", "array"):
+            peak = int(subprocess.check_output([sys.executable, __file__, kind, str(n)]))
+            print("%8d floats, %-5s: peak RSS %7d KB (%.1f bytes per item)"
+                  % (n, kind, peak, (peak - baseline) * 1024.0 / n))